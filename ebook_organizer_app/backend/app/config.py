@@ -48,6 +48,9 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE_MB: int = 100
     SUPPORTED_FORMATS: list = ["epub", "pdf", "mobi", "azw", "azw3", "fb2"]
     
+    # Reorganization - concurrent file copies (1 = sequential; always sequential on Windows)
+    REORGANIZE_COPY_WORKERS: int = 8
+    
     # Paths
     BASE_DIR: Path = Path(__file__).resolve().parent.parent
     CACHE_DIR: Path = BASE_DIR / "cache"
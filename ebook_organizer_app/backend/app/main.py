@@ -3,6 +3,10 @@ FastAPI Backend for Ebook Organizer
 Handles cloud storage integration, metadata extraction, and ebook management
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -11,6 +15,7 @@ from contextlib import asynccontextmanager
 
 from app.routes import ebooks, cloud, metadata, sync, conversion, organization
 from app.services.database import init_db
+from app.services.openlibrary_service import close_client as close_openlibrary_client
 from app.logging_config import logger
 from app.config import settings
 from app.auth import verify_api_key
@@ -28,6 +33,10 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting Ebook Organizer Backend...")
+    # Worker threads for blocking file work (metadata parsing/writing)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    )
     init_db()
     logger.info("Database initialized")
     if settings.API_KEY:
@@ -37,6 +46,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down Ebook Organizer Backend...")
+    close_openlibrary_client()
 
 
 # Apply API-key dependency globally to all routes
@@ -15,7 +15,7 @@ class Ebook(Base):
     # Cloud Storage Info
     cloud_provider = Column(String(50), nullable=False)  # google_drive, onedrive
     cloud_file_id = Column(String(255), unique=True, nullable=False, index=True)
-    cloud_file_path = Column(String(500))
+    cloud_file_path = Column(String(500), index=True)  # local sync looks files up by path
     
     # Metadata
     title = Column(String(500), nullable=False, index=True)
@@ -38,7 +38,7 @@ class Ebook(Base):
     
     # Sync State
     last_synced = Column(DateTime, default=datetime.utcnow)
-    cloud_modified_time = Column(DateTime, nullable=True)  # modifiedTime from Drive API
+    cloud_modified_time = Column(DateTime, nullable=True)  # modifiedTime from Drive API, or local file mtime
     is_synced = Column(Boolean, default=True)
     sync_status = Column(String(50), default="synced")  # synced, pending, error
     
@@ -89,6 +89,8 @@ class ReorganizePreviewRequest(BaseModel):
     source_path: Optional[str] = None
     include_unclassified: bool = False
     operation: str = "move"
+    # Only return file counts (no planned moves); local destinations only
+    counts_only: bool = False
 
 
 class PlannedMoveResponse(BaseModel):
@@ -171,6 +173,7 @@ async def get_stats(
 async def preview(
     source_path: Optional[str] = Query(None, description="Filter by source path prefix"),
     limit: int = Query(100, ge=1, le=500, description="Number of books to preview"),
+    network: bool = Query(False, description="Query Open Library for books without a cached lookup"),
     db: Session = Depends(get_db)
 ):
     """
@@ -179,9 +182,10 @@ async def preview(
     Returns a tree structure showing the proposed organization:
     Category -> SubGenre -> [books]
     
-    Files are NOT modified - this is a dry run.
+    Files are NOT modified - this is a dry run. Open Library is only
+    consulted through its cache unless network=true.
     """
-    return preview_classification(db, source_path, limit)
+    return preview_classification(db, source_path, limit, network)
 
 
 @router.post("/classify/{ebook_id}", response_model=ClassificationResultResponse)
@@ -342,6 +346,7 @@ async def reorganize_preview(
                 source_path=request.source_path,
                 include_unclassified=request.include_unclassified,
                 operation=request.operation,
+                counts_only=request.counts_only,
             )
         return ReorganizePreviewResponse(
             destination=plan.destination,
@@ -1,7 +1,7 @@
 """Database service for SQLAlchemy session management"""
 
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from app.models.database import Base
 from app.config import settings
@@ -14,6 +14,27 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
+# SQLite connection tuning, applied to every pooled connection. WAL with
+# synchronous=NORMAL drops the fsync per commit, which the FTS triggers
+# make expensive during sync; temp_store keeps FTS merges off disk.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MB
+    "PRAGMA mmap_size=268435456",  # 256 MB
+)
+
+if "sqlite" in settings.DATABASE_URL:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -36,7 +57,7 @@ def init_db():
 
 
 def _run_schema_migrations():
-    """Add any columns that exist in models but not yet in the DB."""
+    """Add any columns and indexes that exist in models but not yet in the DB."""
     import sqlite3
     conn = engine.raw_connection()
     cursor = conn.cursor()
@@ -52,6 +73,17 @@ def _run_schema_migrations():
             if col not in existing:
                 cursor.execute(f"ALTER TABLE ebooks ADD COLUMN {col} {col_type}")
                 logger.info(f"Migration: added column ebooks.{col}")
+
+        # Indexes added to the model after the table was first created
+        # (or not expressible on the model, like the NOCASE ones that let
+        # prefix LIKE in search suggestions use an index range scan)
+        index_migrations = [
+            ("ix_ebooks_cloud_file_path", "cloud_file_path"),
+            ("ix_ebooks_title_nocase", "title COLLATE NOCASE"),
+            ("ix_ebooks_author_nocase", "author COLLATE NOCASE"),
+        ]
+        for index_name, columns in index_migrations:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON ebooks ({columns})")
         conn.commit()
     except Exception as e:
         logger.warning(f"Schema migration note: {e}")
@@ -13,10 +13,13 @@ import json
 import logging
 import os
 import shutil
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models.database import Ebook, CloudConfig
 from app.services.metadata_classifier import is_valid_author, clean_author_name
 
@@ -26,6 +29,13 @@ logger = logging.getLogger(__name__)
 UNKNOWN_AUTHOR = "Unknown Author"
 UNCLASSIFIED_FOLDER = "Unclassified"
 
+# Path separators a destination root may already end with
+_PATH_SEPARATORS = tuple(sep for sep in (os.sep, os.altsep) if sep)
+
+# Whitespace trimmed in SQL to match str.strip() in _is_classified
+# (SQLite's one-argument trim() only removes spaces)
+_WHITESPACE = ' \t\n\r\v\f'
+
 
 @dataclass
 class PlannedMove:
@@ -81,18 +91,46 @@ def _sanitize_folder_name(name: str) -> str:
     return sanitized.strip() or "Unknown"
 
 
-def _resolve_collision(target_path: str) -> str:
-    """If target_path already exists, append numeric suffix before extension."""
-    if not os.path.exists(target_path):
+def _resolve_collision(target_path: str, reserved: Optional[set] = None) -> str:
+    """If target_path already exists, append numeric suffix before extension.
+
+    Paths in *reserved* are treated as taken even if not yet on disk
+    (e.g. copies still queued in the same run).
+    """
+    def taken(path: str) -> bool:
+        return (reserved is not None and path in reserved) or os.path.exists(path)
+
+    if not taken(target_path):
         return target_path
 
     base, ext = os.path.splitext(target_path)
     counter = 1
-    while os.path.exists(f"{base} ({counter}){ext}"):
+    while taken(f"{base} ({counter}){ext}"):
         counter += 1
     return f"{base} ({counter}){ext}"
 
 
+def _copy_one(pair: Tuple[str, str]) -> Optional[Exception]:
+    """Copy a single (source, target) pair, returning the error if it failed."""
+    try:
+        shutil.copy2(*pair)
+        return None
+    except Exception as e:
+        return e
+
+
+def _copy_files(pairs: List[Tuple[str, str]]) -> List[Optional[Exception]]:
+    """Copy (source, target) pairs concurrently on a thread pool.
+
+    shutil.copy2 releases the GIL and uses the kernel fast-copy path
+    (sendfile on Linux), so independent files overlap their I/O.
+    Returns the error (or None) for each pair, in order.
+    """
+    workers = min(settings.REORGANIZE_COPY_WORKERS, len(pairs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_copy_one, pairs))
+
+
 def _get_author_folder(ebook: Ebook) -> str:
     """Determine author folder name. Returns UNKNOWN_AUTHOR if invalid."""
     author = ebook.author
@@ -111,6 +149,21 @@ def _is_classified(ebook: Ebook) -> bool:
     )
 
 
+def _filter_classified(query, include_unclassified: bool):
+    """Restrict *query* to classified ebooks unless unclassified are wanted.
+
+    SQL counterpart of _is_classified, so skipped rows are never fetched.
+    """
+    if include_unclassified:
+        return query
+    return query.filter(
+        Ebook.category.isnot(None),
+        func.trim(Ebook.category, _WHITESPACE) != '',
+        Ebook.sub_genre.isnot(None),
+        func.trim(Ebook.sub_genre, _WHITESPACE) != '',
+    )
+
+
 def compute_target_path(
     ebook: Ebook,
     destination: str,
@@ -124,13 +177,19 @@ def compute_target_path(
     """
     filename = os.path.basename(ebook.cloud_file_path)
 
+    # Segments are sanitized (no separators or drive letters), so plain
+    # string building gives the same result as os.path.join
+    root = destination
+    if root and not root.endswith(_PATH_SEPARATORS):
+        root += os.sep
+
     if is_classified:
         category = _sanitize_folder_name(ebook.category)
         sub_genre = _sanitize_folder_name(ebook.sub_genre)
         author_folder = _get_author_folder(ebook)
-        return os.path.join(destination, category, sub_genre, author_folder, filename)
+        return f"{root}{category}{os.sep}{sub_genre}{os.sep}{author_folder}{os.sep}{filename}"
     else:
-        return os.path.join(destination, UNCLASSIFIED_FOLDER, filename)
+        return f"{root}{UNCLASSIFIED_FOLDER}{os.sep}{filename}"
 
 
 def generate_reorganize_plan(
@@ -139,6 +198,7 @@ def generate_reorganize_plan(
     source_path: Optional[str] = None,
     include_unclassified: bool = False,
     operation: str = "move",
+    counts_only: bool = False,
 ) -> ReorganizePlan:
     """
     Generate a preview plan without executing any file operations.
@@ -149,6 +209,9 @@ def generate_reorganize_plan(
         source_path: Optional source path prefix filter
         include_unclassified: Whether to include unclassified books
         operation: "move" or "copy"
+        counts_only: Only tally the file counts. Skips target path and
+            collision resolution, so planned_moves stays empty and
+            collisions is 0.
 
     Returns:
         ReorganizePlan with list of PlannedMove objects
@@ -158,6 +221,7 @@ def generate_reorganize_plan(
     query = db.query(Ebook)
     if source_path:
         query = query.filter(Ebook.cloud_file_path.like(f"{source_path}%"))
+    query = _filter_classified(query, include_unclassified)
 
     ebooks = query.all()
     collisions = 0
@@ -166,9 +230,14 @@ def generate_reorganize_plan(
         if not ebook.cloud_file_path:
             continue
 
-        classified = _is_classified(ebook)
+        classified = not include_unclassified or _is_classified(ebook)
 
-        if not classified and not include_unclassified:
+        if classified:
+            plan.classified_files += 1
+        else:
+            plan.unclassified_files += 1
+
+        if counts_only:
             continue
 
         target = compute_target_path(ebook, destination, classified)
@@ -189,12 +258,7 @@ def generate_reorganize_plan(
         )
         plan.planned_moves.append(move)
 
-        if classified:
-            plan.classified_files += 1
-        else:
-            plan.unclassified_files += 1
-
-    plan.total_files = len(plan.planned_moves)
+    plan.total_files = plan.classified_files + plan.unclassified_files
     plan.collisions = collisions
     return plan
 
@@ -227,20 +291,29 @@ def execute_reorganization(
     query = db.query(Ebook)
     if source_path:
         query = query.filter(Ebook.cloud_file_path.like(f"{source_path}%"))
+    query = _filter_classified(query, include_unclassified)
 
     ebooks = query.all()
 
+    # Target folders already created in this run (skips repeated makedirs)
+    seen_dirs: set = set()
+    # Targets claimed in this run, so queued copies don't collide
+    reserved_targets: set = set()
+
+    # Copies are queued and run concurrently after the loop
+    parallel_copy = (
+        operation == "copy"
+        and os.name != "nt"
+        and settings.REORGANIZE_COPY_WORKERS > 1
+    )
+    pending_copies: List[Tuple[Ebook, str, str]] = []
+
     for ebook in ebooks:
         try:
             if not ebook.cloud_file_path:
                 result.skipped += 1
                 continue
 
-            classified = _is_classified(ebook)
-            if not classified and not include_unclassified:
-                result.skipped += 1
-                continue
-
             source = ebook.cloud_file_path
 
             if not os.path.isfile(source):
@@ -248,13 +321,22 @@ def execute_reorganization(
                 result.errors.append(f"Source not found: {source}")
                 continue
 
+            classified = not include_unclassified or _is_classified(ebook)
             target = compute_target_path(ebook, destination, classified)
-            target = _resolve_collision(target)
+            # Targets claimed earlier in this run count as taken too
+            target = _resolve_collision(target, reserved_targets)
+            reserved_targets.add(target)
 
-            os.makedirs(os.path.dirname(target), exist_ok=True)
+            parent = os.path.dirname(target)
+            if parent not in seen_dirs:
+                os.makedirs(parent, exist_ok=True)
+                seen_dirs.add(parent)
 
             if operation == "move":
                 shutil.move(source, target)
+            elif parallel_copy:
+                pending_copies.append((ebook, source, target))
+                continue
             else:
                 shutil.copy2(source, target)
 
@@ -274,6 +356,17 @@ def execute_reorganization(
             result.total_processed += 1
             result.errors.append(f"{ebook.title}: {str(e)}")
 
+    if pending_copies:
+        copy_errors = _copy_files([(src, dst) for _, src, dst in pending_copies])
+        for (ebook, source, target), error in zip(pending_copies, copy_errors):
+            result.total_processed += 1
+            if error is None:
+                result.path_mappings[source] = target
+                result.succeeded += 1
+            else:
+                result.failed += 1
+                result.errors.append(f"{ebook.title}: {str(error)}")
+
     if result.succeeded > 0:
         db.commit()
 
@@ -361,17 +454,16 @@ def generate_drive_reorganize_plan(
         operation="move",
     )
 
-    ebooks = db.query(Ebook).filter(
-        Ebook.cloud_provider == "google_drive"
+    ebooks = _filter_classified(
+        db.query(Ebook).filter(Ebook.cloud_provider == "google_drive"),
+        include_unclassified,
     ).all()
 
     for ebook in ebooks:
         if not ebook.cloud_file_id:
             continue
 
-        classified = _is_classified(ebook)
-        if not classified and not include_unclassified:
-            continue
+        classified = not include_unclassified or _is_classified(ebook)
 
         path_parts = _compute_drive_folder_path(ebook)
         if not path_parts:
@@ -427,8 +519,9 @@ async def execute_drive_reorganization(
     # Cache to avoid re-creating folders within one run
     folder_cache: Dict[str, str] = {}
 
-    ebooks = db.query(Ebook).filter(
-        Ebook.cloud_provider == "google_drive"
+    ebooks = _filter_classified(
+        db.query(Ebook).filter(Ebook.cloud_provider == "google_drive"),
+        include_unclassified,
     ).all()
 
     for ebook in ebooks:
@@ -437,11 +530,6 @@ async def execute_drive_reorganization(
                 result.skipped += 1
                 continue
 
-            classified = _is_classified(ebook)
-            if not classified and not include_unclassified:
-                result.skipped += 1
-                continue
-
             path_parts = _compute_drive_folder_path(ebook)
             if not path_parts:
                 result.skipped += 1
@@ -489,17 +577,16 @@ def generate_cloud_reorganize_plan(
         operation="move",
     )
 
-    ebooks = db.query(Ebook).filter(
-        Ebook.cloud_provider == cloud_provider
+    ebooks = _filter_classified(
+        db.query(Ebook).filter(Ebook.cloud_provider == cloud_provider),
+        include_unclassified,
     ).all()
 
     for ebook in ebooks:
         if not ebook.cloud_file_id:
             continue
 
-        classified = _is_classified(ebook)
-        if not classified and not include_unclassified:
-            continue
+        classified = not include_unclassified or _is_classified(ebook)
 
         path_parts = _compute_drive_folder_path(ebook)
         if not path_parts:
@@ -554,8 +641,9 @@ async def execute_cloud_reorganization(
 
     folder_cache: Dict[str, str] = {}
 
-    ebooks = db.query(Ebook).filter(
-        Ebook.cloud_provider == cloud_provider
+    ebooks = _filter_classified(
+        db.query(Ebook).filter(Ebook.cloud_provider == cloud_provider),
+        include_unclassified,
     ).all()
 
     for ebook in ebooks:
@@ -564,11 +652,6 @@ async def execute_cloud_reorganization(
                 result.skipped += 1
                 continue
 
-            classified = _is_classified(ebook)
-            if not classified and not include_unclassified:
-                result.skipped += 1
-                continue
-
             path_parts = _compute_drive_folder_path(ebook)
             if not path_parts:
                 result.skipped += 1
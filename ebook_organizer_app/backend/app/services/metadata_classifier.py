@@ -11,13 +11,15 @@ Also provides author validation and extraction utilities.
 """
 
 import re
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 from dataclasses import dataclass
 
 from app.services.taxonomy import (
     classify_genre,
     classify_from_folder,
+    classify_from_known_work,
     classify_from_title
 )
 from app.services.openlibrary_service import lookup_book_metadata
@@ -28,7 +30,7 @@ from app.services.openlibrary_service import lookup_book_metadata
 # =============================================================================
 
 # Blacklist for invalid/junk author values
-AUTHOR_BLACKLIST = {
+AUTHOR_BLACKLIST = frozenset({
     'unknown', 'unknown author', 'none', 'null', 'n/a', 'na',
     'admin', 'administrator', 'user', 'owner',
     'author', 'writer', 'editor',
@@ -41,7 +43,7 @@ AUTHOR_BLACKLIST = {
     # Website watermarks
     'gnv64', 'mobilism', 'libgen', 'z-library',
     'downmagaz.net', 'downmagaz', 'useruplod.net', 'userupload',
-}
+})
 
 # Patterns that indicate junk author values
 AUTHOR_BLACKLIST_PATTERNS = [
@@ -54,6 +56,9 @@ AUTHOR_BLACKLIST_PATTERNS = [
     r'\.net$',            # Domain names
     r'\.org$',            # Domain names
 ]
+_AUTHOR_BLACKLIST_RE = re.compile(
+    '|'.join(f'(?:{p})' for p in AUTHOR_BLACKLIST_PATTERNS), re.IGNORECASE
+)
 
 # Filename patterns for extracting author/title
 FILENAME_PATTERNS = [
@@ -73,6 +78,31 @@ FILENAME_PATTERNS = [
     r'^(?P<title>.+?)_(?P<author>[A-Z][a-z]+(?:_[A-Z][a-z]+)+)(?:_\d{4})?(?:_.+)?$',
 ]
 
+# Compiled forms of FILENAME_PATTERNS. The combined regex tries every pattern in
+# a single pass; group names are suffixed with the branch index (author0,
+# title0, author1, ...) so the matching branch can be identified afterwards.
+_FILENAME_BRANCHES = [re.compile(p, re.IGNORECASE) for p in FILENAME_PATTERNS]
+_FILENAME_COMBINED = re.compile(
+    '|'.join(
+        '(?:' + re.sub(r'\(\?P<(author|title)>', r'(?P<\g<1>' + str(i) + '>', p) + ')'
+        for i, p in enumerate(FILENAME_PATTERNS)
+    ),
+    re.IGNORECASE
+)
+
+# Junk removed from filenames before pattern matching: @mentions and
+# "(PDFDrive)" / "(z-lib.org)" download-site tags
+_FILENAME_CLEANUP = re.compile(r'@\w+|\s*\(\s*(?:PDFDrive|z-lib\.org)\s*\)\s*', re.IGNORECASE)
+_UNDERSCORES = re.compile(r'_+')
+
+# More than 5 non-ASCII characters in a row: binary garbage, not a name
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]{6}')
+
+# clean_author_name: role suffixes like "author"/"editor", and life years
+# like "1835-1910" or "1954-"
+_AUTHOR_ROLE_SUFFIX = re.compile(r'\s+(author|editor|translator|compiled by)\s*$', re.IGNORECASE)
+_AUTHOR_LIFE_YEARS = re.compile(r',?\s*\d{4}\s*-\s*\d{0,4}\s*$')
+
 
 # =============================================================================
 # UTILITY FUNCTIONS
@@ -91,23 +121,18 @@ def is_printable_text(text: Optional[str]) -> bool:
     if r'\x' in text or '\\x' in text:
         return False
     
+    # Fast path: plain printable ASCII needs no ratio or streak checks
+    if text.isascii() and text.isprintable():
+        return True
+    
     # Check ratio of printable characters
     printable_count = sum(1 for c in text if c.isprintable() or c.isspace())
     if len(text) > 0 and printable_count / len(text) < 0.8:
         return False
     
     # Check for too many non-ASCII characters in a row
-    non_ascii_streak = 0
-    max_streak = 0
-    for c in text:
-        if ord(c) > 127:
-            non_ascii_streak += 1
-            max_streak = max(max_streak, non_ascii_streak)
-        else:
-            non_ascii_streak = 0
-    
     # Allow some non-ASCII (for names like Schrödinger) but not garbage
-    if max_streak > 5:
+    if _NON_ASCII_RUN.search(text):
         return False
     
     return True
@@ -118,20 +143,32 @@ def is_valid_author(author: Optional[str]) -> bool:
     if not author:
         return False
     
-    # First check if it's printable text at all
+    stripped = author.strip()
+    
+    # Quick rejects: too short/long to be a name, or no letters up front
+    # (pure numbers, years, punctuation)
+    if len(stripped) < 3 or len(stripped) > 200:
+        return False
+    if not any(c.isalpha() for c in stripped[:20]):
+        return False
+    
+    # Check if it's printable text at all
     if not is_printable_text(author):
         return False
     
-    author_lower = author.lower().strip()
+    # Already-lowercase ASCII values (common for watermarks) skip the .lower() copy
+    if stripped.isascii() and stripped.islower():
+        author_lower = stripped
+    else:
+        author_lower = stripped.lower()
     
     # Check blacklist
     if author_lower in AUTHOR_BLACKLIST:
         return False
     
-    # Check patterns
-    for pattern in AUTHOR_BLACKLIST_PATTERNS:
-        if re.match(pattern, author, re.IGNORECASE):
-            return False
+    # Check patterns (searched, so end-anchored ones like \.com$ apply too)
+    if _AUTHOR_BLACKLIST_RE.search(stripped):
+        return False
     
     return True
 
@@ -142,10 +179,10 @@ def clean_author_name(author: Optional[str]) -> Optional[str]:
         return None
     
     # Remove common suffixes like "author", "editor"
-    author = re.sub(r'\s+(author|editor|translator|compiled by)\s*$', '', author, flags=re.IGNORECASE)
+    author = _AUTHOR_ROLE_SUFFIX.sub('', author)
     
     # Remove birth/death years like "1835-1910" or "1954-"
-    author = re.sub(r',?\s*\d{4}\s*-\s*\d{0,4}\s*$', '', author)
+    author = _AUTHOR_LIFE_YEARS.sub('', author)
     
     # Remove trailing punctuation
     author = author.rstrip('.,;:')
@@ -153,44 +190,80 @@ def clean_author_name(author: Optional[str]) -> Optional[str]:
     return author.strip() if author.strip() else None
 
 
+def _author_from_match(
+    author: Optional[str],
+    title: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """Apply the author-name heuristics to one filename pattern match.
+    
+    Returns (author, title), or (None, None) if the match was rejected.
+    """
+    author = (author or '').strip()
+    title = (title or '').strip()
+    
+    # Validate: author should look like a name
+    if not author:
+        return None, None
+    
+    word_count = len(author.split())
+    
+    # Heuristic: author names typically have 1-4 words
+    if word_count > 4:
+        return None, None
+    
+    # If the "author" part is longer than "title", they might be swapped
+    if title and len(author) > len(title) * 1.5 and word_count > 2:
+        # Swap - this is probably "Title - Author" not "Author - Title"
+        author, title = title, author
+    
+    # Clean up author
+    author = author.replace('_', ' ').strip()
+    
+    # Validate cleaned author
+    return (author, title or None) if is_valid_author(author) else (None, None)
+
+
 def extract_from_filename(filepath: Path) -> Optional[str]:
     """Extract author from filename using pattern matching."""
+    return split_filename(filepath)[0]
+
+
+def split_filename(filepath: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Split a filename into (author, title) using pattern matching.
+    
+    Returns (None, None) if no pattern yields a valid author.
+    """
     # Get filename without extension
     filename = filepath.stem
     
     # Clean up filename - remove common junk
-    filename = re.sub(r'@\w+', '', filename)  # Remove @mentions
-    filename = re.sub(r'\s*\(\s*PDFDrive\s*\)\s*', '', filename, flags=re.IGNORECASE)
-    filename = re.sub(r'\s*\(\s*z-lib\.org\s*\)\s*', '', filename, flags=re.IGNORECASE)
-    filename = re.sub(r'_+', ' ', filename)  # Replace underscores with spaces
+    filename = _FILENAME_CLEANUP.sub('', filename)
+    filename = _UNDERSCORES.sub(' ', filename)  # Replace underscores with spaces
     filename = filename.strip()
     
-    for pattern in FILENAME_PATTERNS:
-        match = re.match(pattern, filename, re.IGNORECASE)
+    # Single pass over all patterns; the first matching branch wins
+    match = _FILENAME_COMBINED.match(filename)
+    if not match:
+        return None, None
+    
+    branch = next(
+        i for i in range(len(FILENAME_PATTERNS))
+        if match.group(f'author{i}') is not None
+    )
+    author, title = _author_from_match(match.group(f'author{branch}'), match.group(f'title{branch}'))
+    if author:
+        return author, title
+    
+    # The first match was rejected by the heuristics - try the remaining patterns
+    for pattern in _FILENAME_BRANCHES[branch + 1:]:
+        match = pattern.match(filename)
         if match:
-            groups = match.groupdict()
-            author = groups.get('author', '').strip()
-            title = groups.get('title', '').strip()
-            
-            # Validate: author should look like a name
+            author, title = _author_from_match(match.group('author'), match.group('title'))
             if author:
-                word_count = len(author.split())
-                
-                # Heuristic: author names typically have 1-4 words
-                if word_count <= 4:
-                    # If the "author" part is longer than "title", they might be swapped
-                    if title and len(author) > len(title) * 1.5 and word_count > 2:
-                        # Swap - this is probably "Title - Author" not "Author - Title"
-                        author, title = title, author
-                    
-                    # Clean up author
-                    author = author.replace('_', ' ').strip()
-                    
-                    # Validate cleaned author
-                    if is_valid_author(author):
-                        return author
-    
-    return None
+                return author, title
+    
+    return None, None
 
 
 # =============================================================================
@@ -203,31 +276,27 @@ class ClassificationResult:
     category: Optional[str] = None
     sub_genre: Optional[str] = None
     author: Optional[str] = None
-    metadata_source: str = "unknown"  # embedded, filename, folder, api, title, unknown
+    metadata_source: str = "unknown"  # embedded, filename, folder, known, api, title, unknown
     
 
-def classify_book(
+# Concurrent Open Library lookups in classify_books
+API_LOOKUP_WORKERS = 8
+
+# One book to classify: (filepath, embedded_genre, embedded_author)
+BookToClassify = Tuple[Path, Optional[str], Optional[str]]
+
+
+def _classify_locally(
     filepath: Path,
-    embedded_genre: Optional[str] = None,
-    embedded_author: Optional[str] = None
-) -> ClassificationResult:
+    embedded_genre: Optional[str],
+    embedded_author: Optional[str]
+) -> Tuple[ClassificationResult, bool]:
     """
-    Classify a book into the taxonomy hierarchy using multiple strategies.
+    Run the classification steps that need no network access
+    (embedded author/genre, then folder, then known authors/series).
     
-    Priority:
-    1. Embedded metadata (if valid and in taxonomy)
-    2. Folder-based classification
-    3. Open Library API lookup (if enabled)
-    4. Title/filename keyword classification (last resort)
-    5. Fallback to uncategorized
-    
-    Args:
-        filepath: Path to the ebook file
-        embedded_genre: Genre from embedded metadata (optional)
-        embedded_author: Author from embedded metadata (optional)
-        
     Returns:
-        ClassificationResult with category, sub_genre, author, and source
+        Tuple of (ClassificationResult, is_classified)
     """
     result = ClassificationResult()
     
@@ -246,7 +315,7 @@ def classify_book(
             result.sub_genre = subgenre
             if result.metadata_source == "unknown":
                 result.metadata_source = "embedded"
-            return result
+            return result, True
     
     # Step 2: Try folder-based classification
     category, subgenre = classify_from_folder(filepath)
@@ -255,10 +324,33 @@ def classify_book(
         result.sub_genre = subgenre
         if result.metadata_source == "unknown":
             result.metadata_source = "folder"
-        return result
+        return result, True
+    
+    # Step 2b: Known author or series - skips the Open Library lookup.
+    # "Author - Title" filenames are split so the author part is checked
+    # too and the series match is anchored to the title part
+    filename_author, filename_title = split_filename(filepath)
+    category, subgenre = classify_from_known_work(
+        filename_title or filepath.stem, result.author or filename_author
+    )
+    if category and subgenre:
+        result.category = category
+        result.sub_genre = subgenre
+        if not result.author and filename_author:
+            result.author = filename_author
+        if result.metadata_source == "unknown":
+            result.metadata_source = "known"
+        return result, True
     
-    # Step 3: Try Open Library API
-    api_author, api_category, api_subgenre = lookup_book_metadata(str(filepath), result.author)
+    return result, False
+
+
+def _apply_api_lookup(
+    result: ClassificationResult,
+    lookup: Tuple[Optional[str], Optional[str], Optional[str]]
+) -> bool:
+    """Apply an Open Library (author, category, subgenre) lookup. Returns True if classified."""
+    api_author, api_category, api_subgenre = lookup
     if api_category and api_subgenre:
         result.category = api_category
         result.sub_genre = api_subgenre
@@ -266,8 +358,12 @@ def classify_book(
         if not result.author and api_author and is_valid_author(api_author):
             result.author = api_author
         result.metadata_source = "api"
-        return result
-    
+        return True
+    return False
+
+
+def _classify_fallback(result: ClassificationResult, filepath: Path) -> ClassificationResult:
+    """Last-resort steps: title keywords, then filename author extraction."""
     # Step 4: Try title/filename keywords (last resort - prone to false positives)
     category, subgenre = classify_from_title(filepath.stem)
     if category and subgenre:
@@ -287,3 +383,108 @@ def classify_book(
     
     # No classification found - return incomplete result
     return result
+
+
+def classify_book(
+    filepath: Path,
+    embedded_genre: Optional[str] = None,
+    embedded_author: Optional[str] = None,
+    network: bool = True
+) -> ClassificationResult:
+    """
+    Classify a book into the taxonomy hierarchy using multiple strategies.
+    
+    Priority:
+    1. Embedded metadata (if valid and in taxonomy)
+    2. Folder-based classification, then known authors/series
+    3. Open Library API lookup (if enabled)
+    4. Title/filename keyword classification (last resort)
+    5. Fallback to uncategorized
+    
+    Args:
+        filepath: Path to the ebook file
+        embedded_genre: Genre from embedded metadata (optional)
+        embedded_author: Author from embedded metadata (optional)
+        network: If False, the API step only uses cached lookups
+        
+    Returns:
+        ClassificationResult with category, sub_genre, author, and source
+    """
+    result, classified = _classify_locally(filepath, embedded_genre, embedded_author)
+    if classified:
+        return result
+    
+    # Step 3: Try Open Library API
+    if _apply_api_lookup(result, lookup_book_metadata(str(filepath), result.author, network)):
+        return result
+    
+    return _classify_fallback(result, filepath)
+
+
+def classify_books(
+    items: List[BookToClassify],
+    network: bool = True,
+    return_exceptions: bool = False
+) -> List[Union[ClassificationResult, Exception]]:
+    """
+    Classify a batch of books, overlapping the Open Library lookups.
+    
+    Same priority order as classify_book. The local steps run first for every
+    book; books still unclassified then have their API lookups run on a thread
+    pool (deduplicated by filepath/author) before the last-resort steps.
+    
+    Args:
+        items: List of (filepath, embedded_genre, embedded_author)
+        network: If False, the API step only uses cached lookups
+        return_exceptions: If True, a book that fails to classify gets the
+            exception in its place instead of failing the whole batch
+        
+    Returns:
+        ClassificationResults (or exceptions) in the same order as items
+    """
+    results: List[Union[ClassificationResult, Exception]] = []
+    pending: List[int] = []
+    
+    for index, (filepath, embedded_genre, embedded_author) in enumerate(items):
+        try:
+            result, classified = _classify_locally(filepath, embedded_genre, embedded_author)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+            continue
+        results.append(result)
+        if not classified:
+            pending.append(index)
+    
+    if not pending:
+        return results
+    
+    def lookup(key: Tuple[str, Optional[str]]):
+        try:
+            return lookup_book_metadata(*key, network)
+        except Exception as e:
+            return e
+    
+    # Step 3: Open Library lookups, one per unique (filepath, author)
+    keys: Dict[int, Tuple[str, Optional[str]]] = {
+        index: (str(items[index][0]), results[index].author) for index in pending
+    }
+    unique_keys = list(dict.fromkeys(keys.values()))
+    with ThreadPoolExecutor(max_workers=min(API_LOOKUP_WORKERS, len(unique_keys))) as pool:
+        lookups = dict(zip(unique_keys, pool.map(lookup, unique_keys)))
+    
+    for index in pending:
+        result = results[index]
+        try:
+            found = lookups[keys[index]]
+            if isinstance(found, Exception):
+                raise found
+            if not _apply_api_lookup(result, found):
+                _classify_fallback(result, items[index][0])
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results[index] = e
+    
+    return results
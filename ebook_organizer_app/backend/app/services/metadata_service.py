@@ -3,16 +3,165 @@ Ebook Metadata Service
 Handles reading and writing metadata for various ebook formats.
 """
 
+import asyncio
+import io
 import os
 import logging
-from typing import Optional, Dict, List, Any
-from dataclasses import dataclass, asdict
+import posixpath
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Tuple
+from dataclasses import dataclass, replace
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Format libraries are imported once here; a missing one only disables
+# that format (the handler raises ImportError when called).
+try:
+    from ebooklib import epub
+except ImportError:  # pragma: no cover
+    epub = None
 
-@dataclass
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pragma: no cover
+    PdfReader = PdfWriter = None
+
+
+def _require(module: Any, name: str) -> None:
+    """Raise ImportError if an optional format library is missing"""
+    if module is None:
+        raise ImportError(f"{name} is required for this format but is not installed")
+
+
+# XML namespaces used when reading EPUB packages directly
+_EPUB_NS = {
+    'n': 'urn:oasis:names:tc:opendocument:xmlns:container',
+    'opf': 'http://www.idpf.org/2007/opf',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+_DC_FIELDS = ('title', 'creator', 'description', 'publisher', 'language',
+              'date', 'subject', 'identifier')
+
+# Compiled XPath objects are not shared across threads, so each worker
+# thread compiles them once and reuses them for every file it reads.
+_xpath_local = threading.local()
+
+
+def _epub_xpaths() -> Dict[str, Any]:
+    """Return this thread's compiled XPath expressions for EPUB reads"""
+    xpaths = getattr(_xpath_local, 'xpaths', None)
+    if xpaths is None:
+        xpaths = {
+            'rootfile': etree.XPath(
+                '//n:rootfile[@media-type="application/oebps-package+xml"]/@full-path',
+                namespaces=_EPUB_NS,
+            ),
+            **{
+                name: etree.XPath(f'/*/opf:metadata/dc:{name}', namespaces=_EPUB_NS)
+                for name in _DC_FIELDS
+            },
+        }
+        _xpath_local.xpaths = xpaths
+    return xpaths
+
+
+# ioctl request number for FICLONE (linux/fs.h)
+_FICLONE = 0x40049409
+
+
+def _reflink_or_copy(src: str, dst: str) -> None:
+    """Copy src to dst, using a copy-on-write clone when the filesystem supports it.
+    
+    Clones (btrfs/xfs FICLONE, APFS clonefile) share the data blocks and finish
+    in constant time; anything else falls back to shutil.copy2.
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            import fcntl
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        if sys.platform == 'darwin':
+            import ctypes
+            libc = ctypes.CDLL('libc.dylib', use_errno=True)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0:
+                return
+    except (OSError, AttributeError):
+        pass
+    shutil.copy2(src, dst)
+
+
+class _PdfIncrementSink:
+    """Write target for a pypdf incremental update.
+    
+    pypdf writes the original file followed by the increment. The first
+    prefix_size bytes are passed over, keeping only their last
+    TAIL_CHECK bytes so the caller can verify they match the file on disk;
+    everything after them is buffered as the increment to append.
+    """
+    
+    TAIL_CHECK = 1024
+    
+    def __init__(self, prefix_size: int):
+        self.prefix_size = prefix_size
+        self.position = 0
+        self.prefix_tail = bytearray()
+        self.increment = bytearray()
+    
+    def write(self, data) -> int:
+        view = memoryview(data)
+        size = len(view)
+        in_prefix = max(0, min(size, self.prefix_size - self.position))
+        if in_prefix:
+            tail_start = max(0, self.prefix_size - self.TAIL_CHECK - self.position)
+            if tail_start < in_prefix:
+                self.prefix_tail += view[tail_start:in_prefix]
+        self.increment += view[in_prefix:]
+        self.position += size
+        return size
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def flush(self) -> None:
+        pass
+
+
+# str() of pypdf values that could not be resolved to text
+_UNRESOLVED_PDF_PREFIXES = ("IndirectObject", "<")
+
+# MOBI EXTH record types we map onto EbookMetadata
+_EXTH_AUTHOR = 100
+_EXTH_PUBLISHER = 101
+_EXTH_DESCRIPTION = 103
+_EXTH_ISBN = 104
+_EXTH_SUBJECT = 105
+_EXTH_DATE = 106
+_EXTH_UPDATED_TITLE = 503
+_EXTH_LANGUAGE = 524
+_MOBI_ENCODINGS = {65001: 'utf-8', 1252: 'cp1252'}
+
+# Matches the default executor size configured in app.main
+DEFAULT_READ_CONCURRENCY = min(32, (os.cpu_count() or 1) * 4)
+
+
+@dataclass(slots=True)
 class EbookMetadata:
     """Universal ebook metadata model"""
     title: Optional[str] = None
@@ -29,7 +178,17 @@ class EbookMetadata:
             self.subjects = []
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Built by hand: asdict() recurses and deep-copies every field
+        return {
+            'title': self.title,
+            'author': self.author,
+            'description': self.description,
+            'publisher': self.publisher,
+            'language': self.language,
+            'date': self.date,
+            'subjects': list(self.subjects),
+            'identifier': self.identifier,
+        }
 
 
 class MetadataService:
@@ -37,6 +196,12 @@ class MetadataService:
     
     SUPPORTED_FORMATS = {'.epub', '.pdf', '.mobi'}
     WRITABLE_FORMATS = {'.epub', '.pdf'}  # MOBI writing is very limited
+    META_CACHE_SIZE = 2048
+    
+    def __init__(self):
+        # abs path -> ((st_mtime_ns, st_size), metadata); LRU order
+        self._meta_cache: "OrderedDict[str, Tuple[Tuple[int, int], EbookMetadata]]" = OrderedDict()
+        self._meta_cache_lock = threading.Lock()
     
     def get_format(self, file_path: str) -> str:
         """Get file extension in lowercase"""
@@ -51,31 +216,93 @@ class MetadataService:
         return self.get_format(file_path) in self.WRITABLE_FORMATS
     
     async def read_metadata(self, file_path: str) -> Optional[EbookMetadata]:
-        """Read metadata from any supported ebook format"""
-        if not os.path.exists(file_path):
+        """Read metadata from any supported ebook format.
+        
+        Parsing runs in a worker thread so the event loop is not blocked.
+        """
+        return await asyncio.to_thread(self._read_metadata_sync, file_path)
+    
+    async def read_many(
+        self, paths: List[str], concurrency: int = DEFAULT_READ_CONCURRENCY
+    ) -> Dict[str, Optional[EbookMetadata]]:
+        """Read metadata for many files concurrently.
+        
+        At most `concurrency` files are parsed at once. Returns a mapping of
+        path -> metadata (None for missing/unreadable files).
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        async def one(path: str):
+            async with sem:
+                return path, await self.read_metadata(path)
+        
+        return dict(await asyncio.gather(*(one(p) for p in paths)))
+    
+    def _read_metadata_sync(self, file_path: str) -> Optional[EbookMetadata]:
+        """Blocking implementation of read_metadata.
+        
+        Parsed results are cached by (path, mtime, size) so unchanged files
+        are not re-parsed.
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return None
         
+        key = os.path.abspath(file_path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._meta_cache_lock:
+            cached = self._meta_cache.get(key)
+            if cached is not None and cached[0] == signature:
+                self._meta_cache.move_to_end(key)
+                return self._copy_metadata(cached[1])
+        
         fmt = self.get_format(file_path)
         
         try:
             if fmt == '.epub':
-                return await self._read_epub_metadata(file_path)
+                metadata = self._read_epub_metadata(file_path)
             elif fmt == '.pdf':
-                return await self._read_pdf_metadata(file_path)
+                metadata = self._read_pdf_metadata(file_path)
             elif fmt == '.mobi':
-                return await self._read_mobi_metadata(file_path)
+                metadata = self._read_mobi_metadata(file_path)
             else:
                 return None
         except Exception as e:
             logger.error(f"Error reading metadata from {file_path}: {e}")
             return None
+        
+        if metadata is None:
+            return None
+        
+        with self._meta_cache_lock:
+            self._meta_cache[key] = (signature, metadata)
+            self._meta_cache.move_to_end(key)
+            while len(self._meta_cache) > self.META_CACHE_SIZE:
+                self._meta_cache.popitem(last=False)
+        return self._copy_metadata(metadata)
+    
+    @staticmethod
+    def _copy_metadata(metadata: EbookMetadata) -> EbookMetadata:
+        """Copy so callers cannot mutate cached entries (incl. subjects)"""
+        return replace(metadata, subjects=list(metadata.subjects))
+    
+    def _invalidate_cache(self, file_path: str) -> None:
+        """Drop any cached metadata for a file"""
+        with self._meta_cache_lock:
+            self._meta_cache.pop(os.path.abspath(file_path), None)
     
     async def write_metadata(self, file_path: str, metadata: EbookMetadata) -> bool:
         """Write metadata to supported ebook format.
         
         Returns True on success.
         Raises an exception with a descriptive message on failure.
+        Writing runs in a worker thread so the event loop is not blocked.
         """
+        return await asyncio.to_thread(self._write_metadata_sync, file_path, metadata)
+    
+    def _write_metadata_sync(self, file_path: str, metadata: EbookMetadata) -> bool:
+        """Blocking implementation of write_metadata"""
         logger.info(f"[METADATA WRITE] Request to write metadata for: {file_path}")
         logger.info(f"[METADATA WRITE] Incoming metadata: title={metadata.title!r}, author={metadata.author!r}, "
                      f"description={metadata.description!r}, publisher={metadata.publisher!r}, "
@@ -92,70 +319,131 @@ class MetadataService:
             logger.warning(f"[METADATA WRITE] Format {fmt} is not writable. Writable formats: {self.WRITABLE_FORMATS}")
             raise ValueError(f"Format {fmt} is not writable")
         
-        if fmt == '.epub':
-            result = await self._write_epub_metadata(file_path, metadata)
-            logger.info(f"[METADATA WRITE] EPUB write result: {result}")
-            return result
-        elif fmt == '.pdf':
-            result = await self._write_pdf_metadata(file_path, metadata)
-            logger.info(f"[METADATA WRITE] PDF write result: {result}")
-            return result
-        else:
-            logger.warning(f"[METADATA WRITE] No write handler for format: {fmt}")
-            raise ValueError(f"No write handler for format: {fmt}")
+        try:
+            if fmt == '.epub':
+                result = self._write_epub_metadata(file_path, metadata)
+                logger.info(f"[METADATA WRITE] EPUB write result: {result}")
+                return result
+            elif fmt == '.pdf':
+                result = self._write_pdf_metadata(file_path, metadata)
+                logger.info(f"[METADATA WRITE] PDF write result: {result}")
+                return result
+            else:
+                logger.warning(f"[METADATA WRITE] No write handler for format: {fmt}")
+                raise ValueError(f"No write handler for format: {fmt}")
+        finally:
+            # mtime granularity can hide a rewrite, so never trust the old entry
+            self._invalidate_cache(file_path)
     
     # ==================== EPUB ====================
     
-    async def _read_epub_metadata(self, file_path: str) -> EbookMetadata:
+    def _read_epub_metadata(self, file_path: str) -> EbookMetadata:
+        """Read metadata from EPUB file.
+        
+        Only the OPF package document is parsed; ebooklib is used as a
+        fallback when the OPF cannot be located.
+        """
+        metadata = self._read_epub_metadata_fast(file_path)
+        if metadata is None:
+            metadata = self._read_epub_metadata_ebooklib(file_path)
+        return metadata
+    
+    def _read_epub_metadata_fast(self, file_path: str) -> Optional[EbookMetadata]:
+        """Read Dublin Core fields straight from content.opf via zipfile + lxml"""
+        if etree is None:
+            return None
+        
+        parser = etree.XMLParser(recover=True, resolve_entities=False)
+        xpaths = _epub_xpaths()
+        
+        with zipfile.ZipFile(file_path) as z:
+            try:
+                container = etree.fromstring(z.read('META-INF/container.xml'), parser)
+            except KeyError:
+                return None
+            if container is None:
+                return None
+            
+            opf_paths = [p for p in xpaths['rootfile'](container) if p]
+            if not opf_paths:
+                return None
+            
+            try:
+                opf = etree.fromstring(z.read(posixpath.normpath(opf_paths[0])), parser)
+            except KeyError:
+                return None
+        
+        if opf is None or opf.find('opf:metadata', _EPUB_NS) is None:
+            return None
+        
+        def get_all(name: str) -> List[Optional[str]]:
+            return [el.text for el in xpaths[name](opf)]
+        
+        def get_first(name: str) -> Optional[str]:
+            values = get_all(name)
+            return values[0] if values else None
+        
+        return EbookMetadata(
+            title=get_first('title'),
+            author=get_first('creator'),
+            description=get_first('description'),
+            publisher=get_first('publisher'),
+            language=get_first('language'),
+            date=get_first('date'),
+            subjects=[v for v in get_all('subject') if v],
+            identifier=get_first('identifier'),
+        )
+    
+    def _read_epub_metadata_ebooklib(self, file_path: str) -> EbookMetadata:
         """Read metadata from EPUB file using ebooklib"""
-        from ebooklib import epub
+        _require(epub, 'ebooklib')
         
         book = epub.read_epub(file_path)
+        # Snapshot the DC namespace once: {name: [(value, attributes), ...]}
+        dc = book.metadata.get(epub.NAMESPACES['DC'], {})
         
-        def get_metadata(namespace: str, name: str) -> Optional[str]:
-            values = book.get_metadata(namespace, name)
+        def get_metadata(name: str) -> Optional[str]:
+            values = dc.get(name)
             if values:
-                # Returns list of tuples: [(value, attributes), ...]
                 return values[0][0] if values[0] else None
             return None
         
-        def get_all_metadata(namespace: str, name: str) -> List[str]:
-            values = book.get_metadata(namespace, name)
-            return [v[0] for v in values if v and v[0]]
+        def get_all_metadata(name: str) -> List[str]:
+            return [v[0] for v in dc.get(name, ()) if v and v[0]]
         
         return EbookMetadata(
-            title=get_metadata('DC', 'title'),
-            author=get_metadata('DC', 'creator'),
-            description=get_metadata('DC', 'description'),
-            publisher=get_metadata('DC', 'publisher'),
-            language=get_metadata('DC', 'language'),
-            date=get_metadata('DC', 'date'),
-            subjects=get_all_metadata('DC', 'subject'),
-            identifier=get_metadata('DC', 'identifier'),
+            title=get_metadata('title'),
+            author=get_metadata('creator'),
+            description=get_metadata('description'),
+            publisher=get_metadata('publisher'),
+            language=get_metadata('language'),
+            date=get_metadata('date'),
+            subjects=get_all_metadata('subject'),
+            identifier=get_metadata('identifier'),
         )
     
-    async def _write_epub_metadata(self, file_path: str, metadata: EbookMetadata) -> bool:
+    def _write_epub_metadata(self, file_path: str, metadata: EbookMetadata) -> bool:
         """Write metadata to EPUB file using ebooklib"""
-        from ebooklib import epub
-        import shutil
+        _require(epub, 'ebooklib')
         
         # Create backup
         backup_path = file_path + '.backup'
-        shutil.copy2(file_path, backup_path)
+        _reflink_or_copy(file_path, backup_path)
         
         try:
             book = epub.read_epub(file_path)
+            # ebooklib keys metadata by namespace URI, not prefix
+            dc = book.metadata.setdefault(epub.NAMESPACES['DC'], {})
             
             # Clear existing metadata we're updating
             if metadata.title:
+                # set_title appends, so drop the old title first
+                dc.pop('title', None)
                 book.set_title(metadata.title)
             
             if metadata.author:
                 # Remove existing creators and add new one
-                book.metadata['DC'] = {
-                    k: v for k, v in book.metadata.get('DC', {}).items() 
-                    if k != 'creator'
-                }
+                dc.pop('creator', None)
                 book.add_author(metadata.author)
             
             if metadata.description:
@@ -169,11 +457,7 @@ class MetadataService:
             
             if metadata.subjects:
                 # Remove existing subjects
-                if 'DC' in book.metadata:
-                    book.metadata['DC'] = {
-                        k: v for k, v in book.metadata['DC'].items()
-                        if k != 'subject'
-                    }
+                dc.pop('subject', None)
                 for subject in metadata.subjects:
                     book.add_metadata('DC', 'subject', subject)
             
@@ -192,31 +476,36 @@ class MetadataService:
     
     # ==================== PDF ====================
     
-    async def _read_pdf_metadata(self, file_path: str) -> EbookMetadata:
+    def _read_pdf_metadata(self, file_path: str) -> EbookMetadata:
         """Read metadata from PDF file using pypdf"""
-        from pypdf import PdfReader
+        _require(PdfReader, 'pypdf')
         
         logger.info(f"[PDF READ] Reading PDF metadata from: {file_path}")
         try:
-            reader = PdfReader(file_path)
-            info = reader.metadata
-            
-            if not info:
-                logger.info(f"[PDF READ] No metadata found in PDF: {file_path}")
-                return EbookMetadata()
-            
-            # Log raw metadata values
-            logger.info(f"[PDF READ] Raw PDF metadata:")
-            for key in ['/Title', '/Author', '/Subject', '/Creator', '/Keywords', '/Producer']:
-                val = info.get(key)
-                logger.info(f"[PDF READ]   {key} = {val!r} (type={type(val).__name__})")
-            
-            result = EbookMetadata(
-                title=self._clean_pdf_value(info.get('/Title')),
-                author=self._clean_pdf_value(info.get('/Author')),
-                description=self._clean_pdf_value(info.get('/Subject')),
-                publisher=self._clean_pdf_value(info.get('/Creator')),
-            )
+            # Hand pypdf an open file rather than a path: given a path it reads
+            # the whole file into memory, given a stream it only seeks to the
+            # trailer, xref and /Info object. Values are resolved lazily, so
+            # everything below must run while the file is still open.
+            with open(file_path, 'rb') as f:
+                reader = PdfReader(f)
+                info = reader.metadata
+                
+                if not info:
+                    logger.info(f"[PDF READ] No metadata found in PDF: {file_path}")
+                    return EbookMetadata()
+                
+                # Log raw metadata values
+                logger.info(f"[PDF READ] Raw PDF metadata:")
+                for key in ['/Title', '/Author', '/Subject', '/Creator', '/Keywords', '/Producer']:
+                    val = info.get(key)
+                    logger.info(f"[PDF READ]   {key} = {val!r} (type={type(val).__name__})")
+                
+                result = EbookMetadata(
+                    title=self._clean_pdf_value(info.get('/Title')),
+                    author=self._clean_pdf_value(info.get('/Author')),
+                    description=self._clean_pdf_value(info.get('/Subject')),
+                    publisher=self._clean_pdf_value(info.get('/Creator')),
+                )
             logger.info(f"[PDF READ] Parsed metadata: title={result.title!r}, author={result.author!r}, "
                          f"description={result.description!r}, publisher={result.publisher!r}")
             return result
@@ -229,28 +518,28 @@ class MetadataService:
         """Clean and convert PDF metadata value to string"""
         if value is None:
             return None
-            
-        # Handle IndirectObject (pypdf)
-        if hasattr(value, "get_object"):
+        
+        # Common case first: pypdf text objects are str subclasses and
+        # resolve to themselves, so skip the get_object() round-trip
+        if not isinstance(value, str) and hasattr(value, "get_object"):
+            # Handle IndirectObject (pypdf)
             try:
                 value = value.get_object()
-            except:
+            except Exception:
                 pass
         
         if isinstance(value, str):
+            # Chained C-level strips beat a regex here for short values
             cleaned = value.strip().strip('/').strip()
             return cleaned if cleaned else None
             
         if isinstance(value, bytes):
-            try:
-                cleaned = value.decode('utf-8', errors='ignore').strip()
-                return cleaned if cleaned else None
-            except:
-                return None
+            cleaned = value.decode('utf-8', errors='ignore').strip()
+            return cleaned if cleaned else None
                 
         # Fallback to string representation, but avoid IndirectObject repr
         s = str(value)
-        if s.startswith("IndirectObject") or s.startswith("<"):
+        if s.startswith(_UNRESOLVED_PDF_PREFIXES):
             return None
             
         return s
@@ -260,9 +549,6 @@ class MetadataService:
         
         Uses os.replace first, falls back to shutil.copy2 + os.remove if that fails.
         """
-        import time
-        import shutil as _shutil
-        
         last_error = None
         for attempt in range(1, max_retries + 1):
             try:
@@ -279,7 +565,7 @@ class MetadataService:
         # Fallback: copy + remove (works when os.replace fails due to cross-device or locks)
         logger.info(f"[PDF WRITE] Attempting fallback: shutil.copy2 + os.remove")
         try:
-            _shutil.copy2(src_path, dst_path)
+            shutil.copy2(src_path, dst_path)
             os.remove(src_path)
             logger.info(f"[PDF WRITE] Fallback copy+remove succeeded")
             return
@@ -290,21 +576,92 @@ class MetadataService:
                 f"Original error: {last_error}. Fallback error: {fallback_error}"
             ) from fallback_error
 
-    async def _write_pdf_metadata(self, file_path: str, metadata: EbookMetadata) -> bool:
-        """Write metadata to PDF file using pypdf"""
-        from pypdf import PdfReader, PdfWriter
-        import shutil
-        import tempfile
+    @staticmethod
+    def _pdf_info_fields(metadata: EbookMetadata) -> Dict[str, str]:
+        """Map EbookMetadata onto PDF /Info dictionary keys"""
+        fields = {}
+        if metadata.title:
+            fields['/Title'] = metadata.title
+        if metadata.author:
+            fields['/Author'] = metadata.author
+        if metadata.description:
+            fields['/Subject'] = metadata.description
+        if metadata.publisher:
+            fields['/Creator'] = metadata.publisher
+        
+        # Add subjects as keywords (comma-separated)
+        if metadata.subjects:
+            fields['/Keywords'] = ', '.join(metadata.subjects)
+        return fields
+    
+    def _append_pdf_info(self, file_path: str, new_metadata: Dict[str, str]) -> bool:
+        """Append an incremental update carrying a new /Info dictionary.
+        
+        The original bytes are left untouched; only the new /Info object,
+        xref section and trailer are appended. Returns False without touching
+        the file when the PDF is encrypted.
+        """
+        _require(PdfWriter, 'pypdf')
+        
+        with open(file_path, 'r+b') as f:
+            original_size = os.fstat(f.fileno()).st_size
+            reader = PdfReader(f)
+            if reader.is_encrypted:
+                return False
+            
+            writer = PdfWriter(reader, incremental=True)
+            writer.add_metadata(new_metadata)
+            sink = _PdfIncrementSink(original_size)
+            writer.write(sink)
+            
+            # pypdf must have reproduced the file as-is and added to its end
+            tail_size = len(sink.prefix_tail)
+            f.seek(original_size - tail_size)
+            if sink.position < original_size or f.read(tail_size) != sink.prefix_tail:
+                raise ValueError("incremental output does not extend the original file")
+            if not sink.increment:
+                return True  # metadata already up to date
+            
+            f.seek(0, os.SEEK_END)
+            if f.tell() != original_size:
+                raise RuntimeError("file changed while preparing the update")
+            try:
+                f.write(sink.increment)
+                f.flush()
+                os.fsync(f.fileno())
+            except Exception:
+                # Roll back to the original bytes
+                f.truncate(original_size)
+                raise
+        return True
+    
+    def _write_pdf_metadata(self, file_path: str, metadata: EbookMetadata) -> bool:
+        """Write metadata to PDF file using pypdf.
+        
+        Unencrypted PDFs get an incremental update appended in place; the
+        full rewrite below is used for encrypted files or if that fails.
+        """
+        _require(PdfWriter, 'pypdf')
         
         logger.info(f"[PDF WRITE] Starting PDF metadata write for: {file_path}")
         
+        new_metadata = self._pdf_info_fields(metadata)
+        
+        if new_metadata:
+            try:
+                if self._append_pdf_info(file_path, new_metadata):
+                    logger.info(f"[PDF WRITE] Appended incremental update with {len(new_metadata)} fields")
+                    return True
+            except Exception as e:
+                logger.warning(f"[PDF WRITE] Incremental update failed, falling back to full rewrite: {e}")
+        
         # Log file size before
-        original_size = os.path.getsize(file_path)
+        original_size = os.stat(file_path).st_size
         logger.info(f"[PDF WRITE] Original file size: {original_size} bytes")
         
         # Create backup
         backup_path = file_path + '.backup'
-        shutil.copy2(file_path, backup_path)
+        _reflink_or_copy(file_path, backup_path)
         logger.info(f"[PDF WRITE] Backup created at: {backup_path}")
         
         try:
@@ -327,41 +684,19 @@ class MetadataService:
                     ) from decrypt_err
             
             # Log existing metadata before update
-            existing_meta = reader.metadata
-            if existing_meta:
-                logger.info(f"[PDF WRITE] Existing PDF metadata:")
-                for key in ['/Title', '/Author', '/Subject', '/Creator', '/Keywords', '/Producer']:
-                    val = existing_meta.get(key)
-                    logger.info(f"[PDF WRITE]   {key} = {val!r}")
-            else:
-                logger.info(f"[PDF WRITE] No existing metadata found in PDF")
-            
-            writer = PdfWriter()
-            
-            # Copy all pages
-            for page in reader.pages:
-                writer.add_page(page)
-            logger.info(f"[PDF WRITE] Copied {len(reader.pages)} pages to writer")
-            
-            # Copy existing metadata
-            if reader.metadata:
-                writer.add_metadata(reader.metadata)
-                logger.info(f"[PDF WRITE] Copied existing metadata to writer")
-            
-            # Update with new metadata
-            new_metadata = {}
-            if metadata.title:
-                new_metadata['/Title'] = metadata.title
-            if metadata.author:
-                new_metadata['/Author'] = metadata.author
-            if metadata.description:
-                new_metadata['/Subject'] = metadata.description
-            if metadata.publisher:
-                new_metadata['/Creator'] = metadata.publisher
+            if logger.isEnabledFor(logging.DEBUG):
+                existing_meta = reader.metadata
+                if existing_meta:
+                    logger.debug(f"[PDF WRITE] Existing PDF metadata:")
+                    for key in ['/Title', '/Author', '/Subject', '/Creator', '/Keywords', '/Producer']:
+                        val = existing_meta.get(key)
+                        logger.debug(f"[PDF WRITE]   {key} = {val!r}")
+                else:
+                    logger.debug(f"[PDF WRITE] No existing metadata found in PDF")
             
-            # Add subjects as keywords (comma-separated)
-            if metadata.subjects:
-                new_metadata['/Keywords'] = ', '.join(metadata.subjects)
+            # Clone the whole document (pages, outline, existing metadata) in one pass
+            writer = PdfWriter(clone_from=reader)
+            logger.info(f"[PDF WRITE] Cloned {len(reader.pages)} pages to writer")
             
             logger.info(f"[PDF WRITE] New metadata to write: {new_metadata}")
             
@@ -383,10 +718,23 @@ class MetadataService:
             logger.info(f"[PDF WRITE] Using system temp file: {temp_path}")
             
             try:
-                with os.fdopen(temp_fd, 'wb') as output_file:
-                    writer.write(output_file)
+                # Serialize in memory, then hand the OS one large write instead
+                # of pypdf's many small ones
+                buffer = io.BytesIO()
+                writer.write(buffer)
+                data = buffer.getbuffer()
+                temp_size = len(data)
+                with os.fdopen(temp_fd, 'wb', buffering=0) as output_file:
+                    if hasattr(os, 'posix_fallocate') and temp_size:
+                        try:
+                            os.posix_fallocate(output_file.fileno(), 0, temp_size)
+                        except OSError:
+                            pass  # not supported by this filesystem
+                    written = 0
+                    while written < temp_size:
+                        written += output_file.write(data[written:])
+                data.release()
                 
-                temp_size = os.path.getsize(temp_path)
                 logger.info(f"[PDF WRITE] Temp file written: {temp_path} ({temp_size} bytes)")
                 
                 # Replace original with temp (with retry for OneDrive locks)
@@ -399,30 +747,33 @@ class MetadataService:
                     logger.info(f"[PDF WRITE] Cleaned up temp file after failure")
                 raise
             
-            final_size = os.path.getsize(file_path)
+            # The original is now byte-for-byte the temp file; no need to stat it again
+            final_size = temp_size
             logger.info(f"[PDF WRITE] Final file size: {final_size} bytes (was {original_size} bytes, delta: {final_size - original_size} bytes)")
             
-            # Verify: re-read the written file to confirm metadata was persisted
-            try:
-                verify_reader = PdfReader(file_path)
-                verify_meta = verify_reader.metadata
-                if verify_meta:
-                    logger.info(f"[PDF WRITE] VERIFICATION — metadata after write:")
-                    for key in ['/Title', '/Author', '/Subject', '/Creator', '/Keywords']:
-                        val = verify_meta.get(key)
-                        logger.info(f"[PDF WRITE]   {key} = {val!r}")
+            # Verify: re-read the written file to confirm metadata was persisted.
+            # This is a full second parse of the PDF, so only do it when debugging.
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    verify_reader = PdfReader(file_path)
+                    verify_meta = verify_reader.metadata
+                    if verify_meta:
+                        logger.debug(f"[PDF WRITE] VERIFICATION — metadata after write:")
+                        for key in ['/Title', '/Author', '/Subject', '/Creator', '/Keywords']:
+                            val = verify_meta.get(key)
+                            logger.debug(f"[PDF WRITE]   {key} = {val!r}")
                     
-                    # Check if the values actually match what we wrote
-                    for key, expected_val in new_metadata.items():
-                        actual_val = verify_meta.get(key)
-                        if actual_val != expected_val:
-                            logger.warning(f"[PDF WRITE] MISMATCH for {key}: expected={expected_val!r}, actual={actual_val!r}")
-                        else:
-                            logger.info(f"[PDF WRITE] VERIFIED {key} matches expected value")
-                else:
-                    logger.warning(f"[PDF WRITE] VERIFICATION FAILED — no metadata found after write!")
-            except Exception as ve:
-                logger.warning(f"[PDF WRITE] Verification read failed: {ve}")
+                        # Check if the values actually match what we wrote
+                        for key, expected_val in new_metadata.items():
+                            actual_val = verify_meta.get(key)
+                            if actual_val != expected_val:
+                                logger.warning(f"[PDF WRITE] MISMATCH for {key}: expected={expected_val!r}, actual={actual_val!r}")
+                            else:
+                                logger.debug(f"[PDF WRITE] VERIFIED {key} matches expected value")
+                    else:
+                        logger.warning(f"[PDF WRITE] VERIFICATION FAILED — no metadata found after write!")
+                except Exception as ve:
+                    logger.warning(f"[PDF WRITE] Verification read failed: {ve}")
             
             # Remove backup on success
             os.remove(backup_path)
@@ -439,7 +790,7 @@ class MetadataService:
     
     # ==================== MOBI ====================
     
-    async def _read_mobi_metadata(self, file_path: str) -> EbookMetadata:
+    def _read_mobi_metadata(self, file_path: str) -> EbookMetadata:
         """
         Read metadata from MOBI file.
         
@@ -448,26 +799,107 @@ class MetadataService:
         """
         # unexpected-import-fix: 'mobi' library installed via pip doesn't expose Mobi class.
         # It only exposes 'extract'. So we use our raw parser instead.
-        return await self._read_mobi_metadata_raw(file_path)
+        return self._read_mobi_metadata_raw(file_path)
     
-    async def _read_mobi_metadata_raw(self, file_path: str) -> EbookMetadata:
+    def _read_mobi_metadata_raw(self, file_path: str) -> EbookMetadata:
         """
         Raw MOBI metadata parsing fallback.
-        MOBI files have a PalmDOC header followed by MOBI-specific headers.
+        MOBI files have a PalmDOC header followed by MOBI-specific headers;
+        author/publisher/etc. live in the optional EXTH block after the
+        MOBI header.
         """
         try:
             with open(file_path, 'rb') as f:
-                # Read PalmDOC header (first 78 bytes)
-                palm_header = f.read(78)
+                # PalmDB header (78 bytes) + first record-list entry
+                palm_header = f.read(86)
                 
-                # Get title from PalmDOC header (offset 0, 32 bytes, null-terminated)
-                title_bytes = palm_header[0:32]
-                title = title_bytes.split(b'\x00')[0].decode('utf-8', errors='ignore').strip()
+                # Title is the PalmDOC database name (offset 0, 32 bytes, null-terminated)
+                end = palm_header.find(b'\x00', 0, 32)
+                db_name = palm_header[:end if end >= 0 else 32].decode('utf-8', errors='ignore').strip()
                 
-                return EbookMetadata(title=title if title else None)
+                metadata = self._read_mobi_headers(f, palm_header) or EbookMetadata()
+            
+            if not metadata.title:
+                metadata.title = db_name or None
+            return metadata
         except Exception as e:
             logger.error(f"Error in raw MOBI parsing: {e}")
             return EbookMetadata()
+    
+    def _read_mobi_headers(self, f, palm_header: bytes) -> Optional[EbookMetadata]:
+        """Parse the MOBI header and EXTH block of record 0.
+        
+        Returns None when the file has no MOBI header.
+        """
+        if len(palm_header) < 86 or palm_header[60:68] != b'BOOKMOBI':
+            return None
+        (num_records,) = struct.unpack_from('>H', palm_header, 76)
+        if num_records == 0:
+            return None
+        (rec0,) = struct.unpack_from('>I', palm_header, 78)
+        
+        # Record 0: 16-byte PalmDOC header, then the MOBI header
+        f.seek(rec0)
+        head = f.read(24)
+        if len(head) < 24 or head[16:20] != b'MOBI':
+            return None
+        (mobi_len,) = struct.unpack_from('>I', head, 20)
+        record0 = head + f.read(max(0, 16 + mobi_len - len(head)))
+        
+        encoding = 'utf-8'
+        if len(record0) >= 32:
+            encoding = _MOBI_ENCODINGS.get(struct.unpack_from('>I', record0, 28)[0], 'utf-8')
+        
+        def decode(raw: bytes) -> Optional[str]:
+            text = raw.decode(encoding, errors='ignore').strip('\x00').strip()
+            return text or None
+        
+        metadata = EbookMetadata()
+        
+        # Full name (offset/length are relative to record 0)
+        if len(record0) >= 92:
+            name_off, name_len = struct.unpack_from('>II', record0, 84)
+            if name_len:
+                f.seek(rec0 + name_off)
+                metadata.title = decode(f.read(name_len))
+        
+        # EXTH block follows the MOBI header when flag 0x40 is set
+        if len(record0) < 132 or not struct.unpack_from('>I', record0, 128)[0] & 0x40:
+            return metadata
+        f.seek(rec0 + 16 + mobi_len)
+        exth_head = f.read(12)
+        if len(exth_head) < 12 or exth_head[:4] != b'EXTH':
+            return metadata
+        exth_len, count = struct.unpack_from('>II', exth_head, 4)
+        exth = f.read(max(0, exth_len - 12))
+        
+        records: Dict[int, List[bytes]] = {}
+        pos = 0
+        for _ in range(count):
+            if pos + 8 > len(exth):
+                break
+            rec_type, rec_len = struct.unpack_from('>II', exth, pos)
+            if rec_len < 8:
+                break
+            records.setdefault(rec_type, []).append(exth[pos + 8:pos + rec_len])
+            pos += rec_len
+        
+        def first(rec_type: int) -> Optional[str]:
+            for raw in records.get(rec_type, ()):
+                value = decode(raw)
+                if value:
+                    return value
+            return None
+        
+        metadata.title = first(_EXTH_UPDATED_TITLE) or metadata.title
+        metadata.author = first(_EXTH_AUTHOR)
+        metadata.publisher = first(_EXTH_PUBLISHER)
+        metadata.description = first(_EXTH_DESCRIPTION)
+        metadata.identifier = first(_EXTH_ISBN)
+        metadata.date = first(_EXTH_DATE)
+        metadata.language = first(_EXTH_LANGUAGE)
+        metadata.subjects = [v for v in map(decode, records.get(_EXTH_SUBJECT, ())) if v]
+        return metadata
 
 
 # Singleton instance
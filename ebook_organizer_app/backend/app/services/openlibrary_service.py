@@ -7,14 +7,29 @@ Includes caching and rate limiting to be respectful to the API.
 API Documentation: https://openlibrary.org/dev/docs/api/search
 """
 
-import urllib.request
+import atexit
+import hashlib
 import urllib.parse
-import urllib.error
 import json
+import re
+import sqlite3
+import threading
 import time
 import logging
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 
+import httpx
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json also accepts bytes
+    _json_loads = json.loads
+
+from app.config import settings
 from app.services.taxonomy import TAXONOMY
 
 logger = logging.getLogger(__name__)
@@ -25,31 +40,230 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 OPENLIBRARY_API_URL = "https://openlibrary.org/search.json"
 API_TIMEOUT = 10  # seconds
-API_RATE_LIMIT_DELAY = 0.1  # seconds between requests
-API_CACHE: Dict[str, Optional[Dict]] = {}  # In-memory cache
+API_RATE_LIMIT_DELAY = 0.1  # minimum seconds between request starts
+API_MAX_CONCURRENCY = 4  # max in-flight requests across all threads
+API_MAX_RETRIES = 2  # extra attempts on transient failures
+API_RETRY_BACKOFF = 0.3  # seconds, doubled after each retry
+API_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+API_CACHE: "OrderedDict[str, Optional[Dict]]" = OrderedDict()  # In-memory LRU cache
+API_CACHE_SIZE = 20000  # max in-memory entries; evicted ones fall back to disk
+
+# On-disk cache so lookups survive restarts; entries past their TTL are
+# revalidated with If-None-Match using the stored ETag.
+API_DISK_CACHE_PATH = settings.CACHE_DIR / "openlibrary_cache.sqlite"
+API_CACHE_TTL = 30 * 24 * 3600  # seconds, for found books
+API_NEGATIVE_CACHE_TTL = 7 * 24 * 3600  # seconds, for "not found" answers
+
+
+# =============================================================================
+# HTTP CLIENT
+# =============================================================================
+# One pooled client for the whole process so lookups reuse keep-alive
+# connections instead of paying a TCP+TLS handshake per request.
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+# Politeness: cap concurrent requests and space out request starts
+_inflight = threading.BoundedSemaphore(API_MAX_CONCURRENCY)
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+
+def _get_client() -> httpx.Client:
+    """Return the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    headers={'User-Agent': 'EbookOrganizer/1.0'},
+                    timeout=API_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=API_MAX_CONCURRENCY,
+                        max_keepalive_connections=API_MAX_CONCURRENCY,
+                    ),
+                )
+    return _client
+
+
+def close_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+# Scripts that never run the app lifespan still release their connections
+atexit.register(close_client)
+
+
+def _wait_for_rate_limit():
+    """Block until this thread may start a request.
+    
+    Reserves the next start slot under a lock, so concurrent callers are
+    spaced API_RATE_LIMIT_DELAY apart without serializing the requests.
+    """
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        start_at = max(now, _next_request_at)
+        _next_request_at = start_at + API_RATE_LIMIT_DELAY
+    if start_at > now:
+        time.sleep(start_at - now)
+
+
+def _get(url: str, headers: Dict[str, str]) -> httpx.Response:
+    """Rate-limited GET on the shared client, retrying transient failures"""
+    delay = API_RETRY_BACKOFF
+    for attempt in range(API_MAX_RETRIES + 1):
+        last_attempt = attempt == API_MAX_RETRIES
+        try:
+            with _inflight:
+                _wait_for_rate_limit()
+                response = _get_client().get(url, headers=headers)
+        except (httpx.TimeoutException, httpx.RemoteProtocolError):
+            # Timeouts and pooled connections dropped by the server are worth
+            # another try; connect/DNS failures (e.g. offline) fail fast
+            if last_attempt:
+                raise
+        else:
+            if response.status_code not in API_RETRY_STATUSES or last_attempt:
+                return response
+        time.sleep(delay)
+        delay *= 2
+
+
+# =============================================================================
+# MEMORY CACHE
+# =============================================================================
+_cache_lock = threading.Lock()
+_MISS = object()
+
+
+def _cache_get(cache_key: str):
+    """Return the in-memory cached result (may be None) or _MISS"""
+    with _cache_lock:
+        result = API_CACHE.get(cache_key, _MISS)
+        if result is not _MISS:
+            API_CACHE.move_to_end(cache_key)
+        return result
+
+
+def _cache_put(cache_key: str, result: Optional[Dict]):
+    """Store a result in memory, evicting the least recently used entries"""
+    with _cache_lock:
+        API_CACHE[cache_key] = result
+        API_CACHE.move_to_end(cache_key)
+        while len(API_CACHE) > API_CACHE_SIZE:
+            API_CACHE.popitem(last=False)
+
+
+# =============================================================================
+# DISK CACHE
+# =============================================================================
+_disk_conn: Optional[sqlite3.Connection] = None
+_disk_lock = threading.Lock()
+_disk_disabled = False
+
+
+def _get_disk_cache() -> Optional[sqlite3.Connection]:
+    """Open the on-disk cache on first use; None if it is unavailable"""
+    global _disk_conn, _disk_disabled
+    if _disk_conn is None and not _disk_disabled:
+        try:
+            API_DISK_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(API_DISK_CACHE_PATH), check_same_thread=False)
+            # WAL + NORMAL: a batch of lookups should not fsync every insert
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS openlibrary_cache ("
+                "key TEXT PRIMARY KEY, etag TEXT, ts INTEGER NOT NULL, body BLOB"
+                ") WITHOUT ROWID"
+            )
+            conn.commit()
+            _disk_conn = conn
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Open Library disk cache unavailable: {e}")
+            _disk_disabled = True
+    return _disk_conn
+
+
+def _disk_key(cache_key: str) -> str:
+    """Fixed-length disk key, so long titles don't bloat the index"""
+    return hashlib.sha1(cache_key.encode('utf-8')).hexdigest()
+
+
+def _disk_get(cache_key: str) -> Optional[Tuple[Optional[str], int, bytes]]:
+    """Return (etag, ts, body) for a cached query, or None"""
+    with _disk_lock:
+        conn = _get_disk_cache()
+        if conn is None:
+            return None
+        try:
+            return conn.execute(
+                "SELECT etag, ts, body FROM openlibrary_cache WHERE key = ?", (_disk_key(cache_key),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Open Library disk cache read failed: {e}")
+            return None
+
+
+def _disk_put(cache_key: str, etag: Optional[str], body: bytes):
+    """Store (or refresh) a query result on disk"""
+    with _disk_lock:
+        conn = _get_disk_cache()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO openlibrary_cache (key, etag, ts, body) VALUES (?, ?, ?, ?)",
+                (_disk_key(cache_key), etag, int(time.time()), body),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Open Library disk cache write failed: {e}")
+
+
+def _is_fresh(ts: int, body: bytes) -> bool:
+    """Whether a disk entry is still within its TTL"""
+    ttl = API_NEGATIVE_CACHE_TTL if body == b'null' else API_CACHE_TTL
+    return time.time() - ts < ttl
 
 
 # =============================================================================
 # API FUNCTIONS
 # =============================================================================
 
-def query_openlibrary(title: str, author: Optional[str] = None) -> Optional[Dict]:
+def query_openlibrary(title: str, author: Optional[str] = None, network: bool = True) -> Optional[Dict]:
     """
     Query Open Library API to get book metadata.
     
     Args:
         title: Book title to search for
         author: Optional author name to narrow search
+        network: If False, answer from the caches only (stale entries
+            included); a miss returns None and is not cached
         
     Returns:
         dict: {'author': str, 'subjects': list, 'title': str} or None if not found
     """
-    global API_CACHE
-    
     # Check cache first
     cache_key = f"{title}|{author or ''}"
-    if cache_key in API_CACHE:
-        return API_CACHE[cache_key]
+    result = _cache_get(cache_key)
+    if result is not _MISS:
+        return result
+    
+    cached = _disk_get(cache_key)
+    if cached is not None and _is_fresh(cached[1], cached[2]):
+        result = _json_loads(cached[2])
+        _cache_put(cache_key, result)
+        return result
+    
+    if not network:
+        return _json_loads(cached[2]) if cached is not None else None
     
     try:
         # Build search query
@@ -66,15 +280,25 @@ def query_openlibrary(title: str, author: Optional[str] = None) -> Optional[Dict
         query = "+".join(query_parts)
         url = f"{OPENLIBRARY_API_URL}?q={query}&fields=title,author_name,subject&limit=1"
         
-        # Make request with timeout
-        req = urllib.request.Request(url, headers={'User-Agent': 'EbookOrganizer/1.0'})
-        with urllib.request.urlopen(req, timeout=API_TIMEOUT) as response:
-            data = json.loads(response.read().decode('utf-8'))
+        # Revalidate a stale disk entry instead of re-downloading it
+        headers = {}
+        if cached is not None and cached[0]:
+            headers['If-None-Match'] = cached[0]
         
-        # Rate limiting - be nice to the server
-        time.sleep(API_RATE_LIMIT_DELAY)
+        # Make request over the pooled client, rate limited to be nice to the server
+        response = _get(url, headers)
+        
+        if response.status_code == 304 and cached is not None:
+            _disk_put(cache_key, cached[0], cached[2])
+            result = _json_loads(cached[2])
+            _cache_put(cache_key, result)
+            return result
+        
+        response.raise_for_status()
+        data = _json_loads(response.content)
         
         # Parse response
+        result = None
         if data.get('docs') and len(data['docs']) > 0:
             doc = data['docs'][0]
             result = {
@@ -82,19 +306,89 @@ def query_openlibrary(title: str, author: Optional[str] = None) -> Optional[Dict
                 'author': doc.get('author_name', [None])[0],
                 'subjects': doc.get('subject', [])
             }
-            API_CACHE[cache_key] = result
-            return result
         
         # Cache negative result too
-        API_CACHE[cache_key] = None
-        return None
+        _cache_put(cache_key, result)
+        _disk_put(cache_key, response.headers.get('etag'), json.dumps(result).encode('utf-8'))
+        return result
         
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, 
-            TimeoutError, Exception) as e:
+    except (httpx.HTTPError, json.JSONDecodeError, TimeoutError, Exception) as e:
         # Silently fail - API lookup is best-effort
         logger.warning(f"Open Library API error: {e}")
-        API_CACHE[cache_key] = None
-        return None
+        # A stale answer beats none; errors themselves are only cached in memory
+        result = _json_loads(cached[2]) if cached is not None else None
+        _cache_put(cache_key, result)
+        return result
+
+
+# Every keyword tested by the BISAC (Priority 2) and genre (Priority 3)
+# passes of classify_from_api_subjects; keep in sync with those checks.
+# 'HISTORY' also covers the startswith('HISTORY') test.
+_BISAC_KEYWORDS = (
+    'FICTION /', 'SELF-HELP', 'BUSINESS & ECONOMICS', 'TECHNOLOGY & ENGINEERING',
+    'HISTORY', 'PSYCHOLOGY', 'RELIGION', 'PHILOSOPHY', 'HEALTH', 'FITNESS', 'COOKING', 'COOKBOOK',
+)
+_GENRE_KEYWORDS = (
+    'fantasy', 'science fiction', 'sci-fi', 'mystery', 'detective', 'thriller',
+    'suspense', 'horror', 'romance', 'programming', 'computer', 'mathematics', 'physics',
+)
+
+
+def _contains_any(text: str, keywords: Tuple[str, ...]) -> bool:
+    """Check whether any keyword occurs in text"""
+    for keyword in keywords:
+        if keyword in text:
+            return True
+    return False
+
+
+# Category priority for taxonomy matches (lower = higher priority)
+_CATEGORY_PRIORITY = {
+    'Non-Fiction': 1,
+    'Fiction': 2,
+    'Children': 3,
+    'Comics & Graphic Novels': 4,
+    'Reference': 5
+}
+
+
+def _build_taxonomy_index():
+    """
+    Precompute the lookups behind the Priority 4 taxonomy match.
+    
+    Every subgenre gets a sort key (priority, taxonomy order, category,
+    subgenre), so min() picks what a walk over TAXONOMY would pick first.
+    
+    Returns:
+        tuple: (subgenre name -> key, alias fragment -> key,
+                [(key, alias)] sorted by key)
+    """
+    subgenre_index = {}
+    fragment_index = {}
+    alias_scan = []
+    order = 0
+    for category, subgenres in TAXONOMY.items():
+        for subgenre, aliases in subgenres.items():
+            if subgenre == "Other":
+                continue
+            key = (_CATEGORY_PRIORITY.get(category, 10), order, category, subgenre)
+            order += 1
+            name = subgenre.lower()
+            subgenre_index[name] = min(key, subgenre_index.get(name, key))
+            for alias in aliases:
+                alias = alias.lower()
+                alias_scan.append((key, alias))
+                # Subjects shorter than 4 characters are skipped before matching
+                for i in range(len(alias) - 3):
+                    for j in range(i + 4, len(alias) + 1):
+                        fragment = alias[i:j]
+                        fragment_index[fragment] = min(key, fragment_index.get(fragment, key))
+    alias_scan.sort()
+    return subgenre_index, fragment_index, alias_scan
+
+
+_SUBGENRE_INDEX, _ALIAS_FRAGMENT_INDEX, _ALIAS_SCAN = _build_taxonomy_index()
+_NO_MATCH = (float('inf'),)
 
 
 def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Optional[str]]:
@@ -109,9 +403,15 @@ def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Opti
     """
     if not subjects:
         return None, None
-    
+    return _classify_subjects(tuple(subjects))
+
+
+@lru_cache(maxsize=4096)
+def _classify_subjects(subjects: Tuple[str, ...]) -> Tuple[Optional[str], Optional[str]]:
+    """Classify a subject tuple (memoized: subject lists repeat across a library)"""
     # Join all subjects for scanning (case-insensitive)
-    all_subjects_upper = ' | '.join(s.upper() for s in subjects)
+    subjects_upper = [s.upper() for s in subjects]
+    all_subjects_upper = ' | '.join(subjects_upper)
     
     # Priority 1: Biography/Autobiography - these are very specific
     # Check ALL subjects first before anything else
@@ -119,11 +419,11 @@ def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Opti
         return 'Non-Fiction', 'Biography & Memoir'
     
     # Priority 2: Check for explicit BISAC codes which are reliable
-    for subject in subjects:
-        subject_upper = subject.upper()
-        
+    # (one sweep over the joined subjects skips the loop when none can match)
+    has_bisac = _contains_any(all_subjects_upper, _BISAC_KEYWORDS)
+    for subject, subject_upper in (zip(subjects, subjects_upper) if has_bisac else ()):
         # BISAC Fiction categories
-        if subject_upper.startswith('FICTION /') or 'FICTION /' in subject_upper:
+        if 'FICTION /' in subject_upper:
             if 'FANTASY' in subject_upper:
                 return 'Fiction', 'Fantasy'
             if 'SCIENCE FICTION' in subject_upper:
@@ -148,7 +448,7 @@ def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Opti
             return 'Non-Fiction', 'Business & Finance'
         if 'TECHNOLOGY & ENGINEERING' in subject_upper:
             return 'Non-Fiction', 'Science & Technology'
-        if ('HISTORY /' in subject_upper or subject_upper.startswith('HISTORY')) and len(subject) > 10:
+        if len(subject) > 10 and (subject_upper.startswith('HISTORY') or 'HISTORY /' in subject_upper):
             return 'Non-Fiction', 'History'
         if 'PSYCHOLOGY' in subject_upper:
             return 'Non-Fiction', 'Psychology'
@@ -160,8 +460,10 @@ def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Opti
             return 'Non-Fiction', 'Health & Wellness'
     
     # Priority 3: Check for common genre keywords in subjects
-    for subject in subjects:
-        subject_lower = subject.lower().strip()
+    subjects_lower = [s.lower() for s in subjects]
+    has_genre = _contains_any(' | '.join(subjects_lower), _GENRE_KEYWORDS)
+    for subject_lower in (subjects_lower if has_genre else ()):
+        subject_lower = subject_lower.strip()
         
         # Skip very generic subjects
         if len(subject_lower) < 4:
@@ -189,21 +491,12 @@ def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Opti
         if 'mathematics' in subject_lower or 'physics' in subject_lower:
             return 'Non-Fiction', 'Science & Technology'
     
-    # Priority 4: Try to match against taxonomy aliases
-    best_match = (None, None)
-    best_priority = 999
+    # Priority 4: Try to match against taxonomy aliases; the lowest category
+    # priority wins, ties going to the earliest subject then taxonomy order
+    best_key = None
     
-    # Define priority for categories (lower = higher priority)
-    category_priority = {
-        'Non-Fiction': 1,
-        'Fiction': 2,
-        'Children': 3,
-        'Comics & Graphic Novels': 4,
-        'Reference': 5
-    }
-    
-    for subject in subjects:
-        subject_lower = subject.lower().strip()
+    for subject_lower in subjects_lower:
+        subject_lower = subject_lower.strip()
         
         # Skip very generic subjects
         if len(subject_lower) < 4:
@@ -211,71 +504,78 @@ def classify_from_api_subjects(subjects: List[str]) -> Tuple[Optional[str], Opti
         if subject_lower in ['fiction', 'nonfiction', 'non-fiction', 'book', 'books', 'history']:
             continue
         
-        # Try to match against taxonomy
-        for category, subgenres in TAXONOMY.items():
-            for subgenre, aliases in subgenres.items():
-                if subgenre == "Other":
-                    continue
-                
-                # Check if subject matches subgenre or any alias
-                matched = False
-                if subject_lower == subgenre.lower():
-                    matched = True
-                else:
-                    for alias in aliases:
-                        if alias.lower() in subject_lower or subject_lower in alias.lower():
-                            matched = True
-                            break
-                
-                if matched:
-                    priority = category_priority.get(category, 10)
-                    if priority < best_priority:
-                        best_priority = priority
-                        best_match = (category, subgenre)
+        # Subject equals a subgenre name, or is part of an alias
+        key = min(
+            _SUBGENRE_INDEX.get(subject_lower, _NO_MATCH),
+            _ALIAS_FRAGMENT_INDEX.get(subject_lower, _NO_MATCH)
+        )
+        # An alias is part of the subject: the scan is in key order, so the
+        # first hit is the best one and anything past the current best is moot
+        for alias_key, alias in _ALIAS_SCAN:
+            if alias_key >= key or (best_key and alias_key[0] >= best_key[0]):
+                break
+            if alias in subject_lower:
+                key = alias_key
+                break
+        
+        if key is not _NO_MATCH and (best_key is None or key[0] < best_key[0]):
+            best_key = key
     
-    return best_match
+    return best_key[2:] if best_key else (None, None)
 
 
-def lookup_book_metadata(filepath_or_title: str, existing_author: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+# Filename cleanup applied in order by lookup_book_metadata; later steps
+# rely on earlier ones (e.g. year removal sees dashes already turned to spaces)
+_FILENAME_CLEANUP_STEPS = (
+    (re.compile(r'@\w+'), ''),
+    (re.compile(r'\s*\(\s*PDFDrive\s*\)\s*', re.IGNORECASE), ''),
+    (re.compile(r'\s*\(\s*z-lib\.org\s*\)\s*', re.IGNORECASE), ''),
+    (re.compile(r'\[.*?\]'), ''),
+    (re.compile(r'\(.*?\)'), ''),
+    (re.compile(r'_+'), ' '),
+    (re.compile(r'\s*-\s*'), ' '),
+    (re.compile(r'\b(19|20)\d{2}\b'), ''),
+    (re.compile(r'\b(epub|pdf|mobi|azw3?)\b', re.IGNORECASE), ''),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+@lru_cache(maxsize=50000)
+def _clean_title_from_stem(stem: str) -> Optional[str]:
+    """Search title from a filename stem, or None if too little is left (memoized)"""
+    # Remove common junk patterns
+    for pattern, replacement in _FILENAME_CLEANUP_STEPS:
+        stem = pattern.sub(replacement, stem)
+    stem = stem.strip()
+    return stem if len(stem) >= 3 else None
+
+
+def lookup_book_metadata(
+    filepath_or_title: str,
+    existing_author: Optional[str] = None,
+    network: bool = True
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Look up book metadata using Open Library API.
     
     Args:
         filepath_or_title: File path or cleaned title to search
         existing_author: Author name if already known (for better search)
+        network: If False, only use cached API answers
         
     Returns:
         tuple: (author, category, subgenre) - any may be None if not found
     """
     # If filepath, extract clean title from filename
     if '/' in filepath_or_title or '\\' in filepath_or_title:
-        from pathlib import Path
-        import re
-        
-        filepath = Path(filepath_or_title)
-        filename = filepath.stem
-        
-        # Remove common junk patterns
-        filename = re.sub(r'@\w+', '', filename)
-        filename = re.sub(r'\s*\(\s*PDFDrive\s*\)\s*', '', filename, flags=re.IGNORECASE)
-        filename = re.sub(r'\s*\(\s*z-lib\.org\s*\)\s*', '', filename, flags=re.IGNORECASE)
-        filename = re.sub(r'\[.*?\]', '', filename)
-        filename = re.sub(r'\(.*?\)', '', filename)
-        filename = re.sub(r'_+', ' ', filename)
-        filename = re.sub(r'\s*-\s*', ' ', filename)
-        filename = re.sub(r'\b(19|20)\d{2}\b', '', filename)
-        filename = re.sub(r'\b(epub|pdf|mobi|azw3?)\b', '', filename, flags=re.IGNORECASE)
-        filename = re.sub(r'\s+', ' ', filename).strip()
-        
-        if len(filename) < 3:
+        title = _clean_title_from_stem(Path(filepath_or_title).stem)
+        if title is None:
             return None, None, None
-        
-        title = filename
     else:
         title = filepath_or_title
     
     # Query the API
-    result = query_openlibrary(title, existing_author)
+    result = query_openlibrary(title, existing_author, network)
     if not result:
         return None, None, None
     
@@ -290,9 +590,28 @@ def lookup_book_metadata(filepath_or_title: str, existing_author: Optional[str]
 
 
 def clear_cache():
-    """Clear the API cache (useful for testing)"""
-    global API_CACHE
-    API_CACHE.clear()
+    """Clear the API cache, in memory and on disk (useful for testing)"""
+    with _cache_lock:
+        API_CACHE.clear()
+    _classify_subjects.cache_clear()
+    with _disk_lock:
+        conn = _get_disk_cache()
+        if conn is not None:
+            try:
+                conn.execute("DELETE FROM openlibrary_cache")
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Open Library disk cache clear failed: {e}")
+
+
+def close_disk_cache():
+    """Close the on-disk cache; the next lookup reopens API_DISK_CACHE_PATH"""
+    global _disk_conn, _disk_disabled
+    with _disk_lock:
+        if _disk_conn is not None:
+            _disk_conn.close()
+            _disk_conn = None
+        _disk_disabled = False
 
 
 def get_cache_size() -> int:
@@ -8,20 +8,37 @@ Provides ebook organization capabilities:
 """
 
 from typing import List, Dict, Optional, Tuple
+from itertools import islice
+from collections import Counter
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, literal, select, union_all
 
 from app.models.database import Ebook
 from app.services.metadata_classifier import (
+    BookToClassify,
     ClassificationResult,
     classify_book,
+    classify_books,
     is_valid_author,
     clean_author_name
 )
 from app.services.taxonomy import TAXONOMY
 
+# Rows fetched and classified per round trip in preview_classification
+PREVIEW_CHUNK_SIZE = 500
+
+# Derived from TAXONOMY once: category -> sub-genres for the UI, and
+# sub-genre -> first category listing it (shared names like "Other"
+# resolve to the first category, as a walk over TAXONOMY would)
+_TAXONOMY_TREE = {category: tuple(subgenres) for category, subgenres in TAXONOMY.items()}
+_SUBGENRE_TO_CATEGORY = {
+    subgenre: category
+    for category, subgenres in reversed(TAXONOMY.items())
+    for subgenre in subgenres
+}
+
 
 @dataclass
 class OrganizationStats:
@@ -65,10 +82,7 @@ def get_taxonomy_tree() -> Dict:
     Returns:
         Dict with categories and their sub-genres
     """
-    tree = {}
-    for category, subgenres in TAXONOMY.items():
-        tree[category] = [sg for sg in subgenres.keys()]
-    return tree
+    return _TAXONOMY_TREE
 
 
 def get_organization_stats(db: Session, source_path: Optional[str] = None) -> OrganizationStats:
@@ -87,32 +101,31 @@ def get_organization_stats(db: Session, source_path: Optional[str] = None) -> Or
     if source_path:
         query = query.filter(Ebook.cloud_file_path.like(f"{source_path}%"))
     
-    # Total books
-    total = query.count()
-    
-    # Classified books (have both category and sub_genre)
-    classified = query.filter(
+    # Total and classified (have both category and sub_genre) in one scan
+    is_classified = and_(
         Ebook.category.isnot(None),
         Ebook.category != '',
         Ebook.sub_genre.isnot(None),
         Ebook.sub_genre != ''
-    ).count()
-    
-    # Category breakdown
-    category_counts = dict(
-        db.query(Ebook.category, func.count(Ebook.id))
-        .filter(Ebook.category.isnot(None), Ebook.category != '')
-        .group_by(Ebook.category)
-        .all()
     )
-    
-    # Sub-genre breakdown
-    subgenre_counts = dict(
-        db.query(Ebook.sub_genre, func.count(Ebook.id))
-        .filter(Ebook.sub_genre.isnot(None), Ebook.sub_genre != '')
-        .group_by(Ebook.sub_genre)
-        .all()
+    total, classified = query.with_entities(
+        func.count(Ebook.id),
+        func.coalesce(func.sum(case((is_classified, 1), else_=0)), 0)
+    ).one()
+    
+    # Category and sub-genre breakdowns in one round trip, tagged by kind
+    breakdown = union_all(
+        select(literal('category'), Ebook.category, func.count(Ebook.id))
+        .where(Ebook.category.isnot(None), Ebook.category != '')
+        .group_by(Ebook.category),
+        select(literal('sub_genre'), Ebook.sub_genre, func.count(Ebook.id))
+        .where(Ebook.sub_genre.isnot(None), Ebook.sub_genre != '')
+        .group_by(Ebook.sub_genre),
     )
+    category_counts = {}
+    subgenre_counts = {}
+    for kind, value, count in db.execute(breakdown):
+        (category_counts if kind == 'category' else subgenre_counts)[value] = count
     
     return OrganizationStats(
         total_books=total,
@@ -124,55 +137,36 @@ def get_organization_stats(db: Session, source_path: Optional[str] = None) -> Or
     )
 
 
-def classify_single_ebook(
-    db: Session,
-    ebook_id: int,
-    force_reclassify: bool = False
-) -> Tuple[ClassificationResult, bool]:
-    """
-    Classify a single ebook using the taxonomy system.
-    
-    Args:
-        db: Database session
-        ebook_id: ID of ebook to classify
-        force_reclassify: If True, reclassify even if already classified
-        
-    Returns:
-        Tuple of (ClassificationResult, was_updated)
-    """
-    ebook = db.query(Ebook).filter(Ebook.id == ebook_id).first()
-    if not ebook:
-        raise ValueError(f"Ebook with id {ebook_id} not found")
-    
-    # Check if already classified
-    already_classified = (
+def _is_classified(ebook: Ebook) -> bool:
+    """Whether an ebook already has both category and sub-genre"""
+    return bool(
         ebook.category and ebook.sub_genre and 
         ebook.category != '' and ebook.sub_genre != ''
     )
-    
-    if already_classified and not force_reclassify:
-        return ClassificationResult(
-            category=ebook.category,
-            sub_genre=ebook.sub_genre,
-            author=ebook.author,
-            metadata_source="existing"
-        ), False
-    
+
+
+def _existing_classification(ebook: Ebook) -> ClassificationResult:
+    """Classification result describing an ebook's current values"""
+    return ClassificationResult(
+        category=ebook.category,
+        sub_genre=ebook.sub_genre,
+        author=ebook.author,
+        metadata_source="existing"
+    )
+
+
+def _classification_input(ebook: Ebook) -> BookToClassify:
+    """(filepath, embedded_genre, embedded_author) for classify_book(s)"""
     # Get file path for classification
     filepath = Path(ebook.cloud_file_path) if ebook.cloud_file_path else Path(ebook.title)
     
     # Extract embedded genre from existing metadata if available
     embedded_genre = ebook.sub_genre if ebook.sub_genre else None
-    embedded_author = ebook.author
-    
-    # Run classification
-    result = classify_book(
-        filepath=filepath,
-        embedded_genre=embedded_genre,
-        embedded_author=embedded_author
-    )
-    
-    # Update ebook with classification results
+    return filepath, embedded_genre, ebook.author
+
+
+def _apply_classification(ebook: Ebook, result: ClassificationResult) -> bool:
+    """Copy classification results onto an ebook; returns True if anything changed"""
     was_updated = False
     
     if result.category:
@@ -188,6 +182,57 @@ def classify_single_ebook(
         ebook.author = result.author
         was_updated = True
     
+    return was_updated
+
+
+def _classify_ebook_obj(
+    ebook: Ebook,
+    force_reclassify: bool = False
+) -> Tuple[ClassificationResult, bool]:
+    """
+    Classify an already-loaded ebook in place without committing.
+    
+    Returns:
+        Tuple of (ClassificationResult, was_updated)
+    """
+    # Check if already classified
+    if _is_classified(ebook) and not force_reclassify:
+        return _existing_classification(ebook), False
+    
+    # Run classification
+    filepath, embedded_genre, embedded_author = _classification_input(ebook)
+    result = classify_book(
+        filepath=filepath,
+        embedded_genre=embedded_genre,
+        embedded_author=embedded_author
+    )
+    
+    # Update ebook with classification results
+    return result, _apply_classification(ebook, result)
+
+
+def classify_single_ebook(
+    db: Session,
+    ebook_id: int,
+    force_reclassify: bool = False
+) -> Tuple[ClassificationResult, bool]:
+    """
+    Classify a single ebook using the taxonomy system.
+    
+    Args:
+        db: Database session
+        ebook_id: ID of ebook to classify
+        force_reclassify: If True, reclassify even if already classified
+        
+    Returns:
+        Tuple of (ClassificationResult, was_updated)
+    """
+    ebook = db.query(Ebook).filter(Ebook.id == ebook_id).first()
+    if not ebook:
+        raise ValueError(f"Ebook with id {ebook_id} not found")
+    
+    result, was_updated = _classify_ebook_obj(ebook, force_reclassify)
+    
     if was_updated:
         db.commit()
     
@@ -221,10 +266,22 @@ def batch_classify_ebooks(
     
     # 1. Apply overrides first
     if overrides:
+        # Load every overridden ebook in one query; bad ids fail in the loop
+        override_ids = set()
+        for str_id in overrides:
+            try:
+                override_ids.add(int(str_id))
+            except (TypeError, ValueError):
+                pass
+        ebooks_by_id = {
+            ebook.id: ebook
+            for ebook in db.query(Ebook).filter(Ebook.id.in_(override_ids))
+        } if override_ids else {}
+        
         for str_id, data in overrides.items():
             try:
                 ebook_id = int(str_id)
-                ebook = db.query(Ebook).filter(Ebook.id == ebook_id).first()
+                ebook = ebooks_by_id.get(ebook_id)
                 if ebook:
                     old_cat = ebook.category
                     old_sub = ebook.sub_genre
@@ -261,9 +318,6 @@ def batch_classify_ebooks(
                     )
             except Exception:
                 result.failed += 1
-        
-        # Commit manual changes
-        db.commit()
     
     # 2. Proceed with AI classification for others
     if ebook_ids:
@@ -292,11 +346,33 @@ def batch_classify_ebooks(
         
         ebooks = query.limit(limit).all()
     
+    # Already-classified books keep their values unless forced
+    pending: List[Ebook] = []
     for ebook in ebooks:
+        if _is_classified(ebook) and not force_reclassify:
+            result.results[ebook.id] = _existing_classification(ebook)
+            result.total_processed += 1
+            result.already_classified += 1
+            if ebook.cloud_file_path:
+                result.file_classifications[ebook.cloud_file_path] = {
+                    'category': ebook.category,
+                    'sub_genre': ebook.sub_genre
+                }
+        else:
+            pending.append(ebook)
+    
+    # Classify the rest together so their Open Library lookups run concurrently
+    # A book that fails comes back as its exception and only fails itself
+    classifications = classify_books(
+        [_classification_input(e) for e in pending], return_exceptions=True
+    )
+    
+    # Apply results here; the session must stay on this thread
+    for ebook, classification in zip(pending, classifications):
         try:
-            classification, was_updated = classify_single_ebook(
-                db, ebook.id, force_reclassify
-            )
+            if isinstance(classification, Exception):
+                raise classification
+            was_updated = _apply_classification(ebook, classification)
             result.results[ebook.id] = classification
             result.total_processed += 1
             
@@ -318,6 +394,8 @@ def batch_classify_ebooks(
                 metadata_source=f"error: {str(e)}"
             )
     
+    # One commit for overrides and classifications together
+    db.commit()
     return result
 
 
@@ -351,18 +429,14 @@ def update_ebook_classification(
         
     if sub_genre:
         # Find the category this sub_genre belongs to
-        valid = False
-        for cat, subgenres in TAXONOMY.items():
-            if sub_genre in subgenres:
-                valid = True
-                # If category not specified, infer from sub_genre
-                if not category:
-                    ebook.category = cat
-                break
-        
-        if not valid:
+        cat = _SUBGENRE_TO_CATEGORY.get(sub_genre)
+        if cat is None:
             raise ValueError(f"Invalid sub_genre: {sub_genre}")
         
+        # If category not specified, infer from sub_genre
+        if not category:
+            ebook.category = cat
+        
         ebook.sub_genre = sub_genre
     
     db.commit()
@@ -410,7 +484,8 @@ def get_books_by_category(
 def preview_classification(
     db: Session,
     source_path: Optional[str] = None,
-    limit: int = 100
+    limit: int = 100,
+    network: bool = False
 ) -> Dict:
     """
     Preview classification without applying changes.
@@ -420,6 +495,8 @@ def preview_classification(
         db: Database session
         source_path: Filter to specific source path
         limit: Maximum number of books to preview
+        network: If True, query Open Library for books it has no cached
+            answer for; by default the preview only uses cached lookups
         
     Returns:
         Dict with tree structure showing Category -> SubGenre -> [books]
@@ -436,53 +513,50 @@ def preview_classification(
         (Ebook.sub_genre.is_(None)) | (Ebook.sub_genre == '')
     )
     
-    ebooks = query.limit(limit).all()
+    # Stream rows and classify them a chunk at a time (dry run - don't save)
+    # so large previews never hold every ORM object at once
+    ebooks = iter(query.limit(limit).yield_per(PREVIEW_CHUNK_SIZE))
     
     # Build proposed tree
     tree = {}
     books_preview = []
+    category_counts = Counter()
+    total = 0
     
-    for ebook in ebooks:
-        filepath = Path(ebook.cloud_file_path) if ebook.cloud_file_path else Path(ebook.title)
-        
-        # Run classification (dry run - don't save)
-        result = classify_book(
-            filepath=filepath,
-            embedded_genre=ebook.sub_genre if ebook.sub_genre else None,
-            embedded_author=ebook.author
-        )
+    while chunk := list(islice(ebooks, PREVIEW_CHUNK_SIZE)):
+        total += len(chunk)
+        # API lookups within a chunk run concurrently
+        results = classify_books([_classification_input(ebook) for ebook in chunk], network)
         
-        category = result.category or "_Uncategorized"
-        sub_genre = result.sub_genre or "Other"
-        
-        # Build tree structure
-        if category not in tree:
-            tree[category] = {}
-        if sub_genre not in tree[category]:
-            tree[category][sub_genre] = []
-        
-        book_info = {
-            "id": ebook.id,
-            "title": ebook.title,
-            "author": result.author or ebook.author or "Unknown",
-            "source": result.metadata_source,
-            "current_category": ebook.category,
-            "current_subgenre": ebook.sub_genre,
-            "proposed_category": category,
-            "proposed_subgenre": sub_genre
-        }
-        
-        tree[category][sub_genre].append(book_info)
-        books_preview.append(book_info)
-    
-    # Calculate summary counts
-    category_counts = {cat: sum(len(sgs) for sgs in subgenres.values()) 
-                       for cat, subgenres in tree.items()}
+        for ebook, result in zip(chunk, results):
+            category = result.category or "_Uncategorized"
+            sub_genre = result.sub_genre or "Other"
+            
+            # Build tree structure
+            if category not in tree:
+                tree[category] = {}
+            if sub_genre not in tree[category]:
+                tree[category][sub_genre] = []
+            
+            book_info = {
+                "id": ebook.id,
+                "title": ebook.title,
+                "author": result.author or ebook.author or "Unknown",
+                "source": result.metadata_source,
+                "current_category": ebook.category,
+                "current_subgenre": ebook.sub_genre,
+                "proposed_category": category,
+                "proposed_subgenre": sub_genre
+            }
+            
+            tree[category][sub_genre].append(book_info)
+            books_preview.append(book_info)
+            category_counts[category] += 1
     
     return {
-        "total_to_classify": len(ebooks),
+        "total_to_classify": total,
         "tree": tree,
-        "category_counts": category_counts,
+        "category_counts": dict(category_counts),
         "books": books_preview
     }
 
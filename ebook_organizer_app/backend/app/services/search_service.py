@@ -4,8 +4,13 @@ Full-Text Search Service using SQLite FTS5
 Provides high-performance full-text search capabilities for ebooks.
 """
 
+import re
+import threading
+from collections import OrderedDict
+from itertools import chain
 from typing import List, Optional, Tuple
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app.models.database import Ebook
@@ -51,17 +56,42 @@ FTS_TRIGGERS = [
 ]
 
 
+# Triggers fired by sync writes; bulk loads drop them and rebuild once
+FTS_WRITE_TRIGGERS = ("ebooks_ai", "ebooks_au")
+
+
 def init_fts(db: Session) -> None:
-    """Initialize FTS5 virtual table and triggers"""
+    """
+    Initialize FTS5 virtual table and triggers.
+    
+    If the table exists but the write triggers are missing (a bulk load
+    that stopped before enable_fts_triggers() ran), the index is rebuilt so
+    rows inserted meanwhile become searchable.
+    """
     try:
+        existing = set(db.execute(text(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger');"
+        )).scalars())
+        needs_rebuild = (
+            'ebooks_fts' in existing and not existing.issuperset(FTS_WRITE_TRIGGERS)
+        )
+        
         # Create FTS table
         db.execute(text(FTS_TABLE_CREATE))
         
+        # Rebuild before recreating the triggers, in the same transaction:
+        # if the rebuild fails they stay missing and the next start retries
+        if needs_rebuild:
+            db.execute(text("INSERT INTO ebooks_fts(ebooks_fts) VALUES('rebuild');"))
+        
         # Create sync triggers
         for trigger_sql in FTS_TRIGGERS:
             db.execute(text(trigger_sql))
         
         db.commit()
+        if needs_rebuild:
+            invalidate_search_cache()
+            logger.info("FTS index rebuilt after restoring missing triggers")
         logger.info("FTS5 search initialized successfully")
     except Exception as e:
         logger.warning(f"FTS5 initialization warning: {e}")
@@ -72,20 +102,16 @@ def init_fts(db: Session) -> None:
 def rebuild_fts_index(db: Session) -> int:
     """Rebuild FTS index from all ebooks (useful after data import)"""
     try:
-        # Clear existing FTS data
-        db.execute(text("DELETE FROM ebooks_fts;"))
-        
-        # Rebuild from ebooks table
-        db.execute(text("""
-            INSERT INTO ebooks_fts(rowid, title, author, description, category, sub_genre)
-            SELECT id, title, author, description, category, sub_genre FROM ebooks;
-        """))
+        # FTS5 re-reads the content table; unlike deleting rows, this is
+        # safe when the index has drifted from the ebooks table
+        db.execute(text("INSERT INTO ebooks_fts(ebooks_fts) VALUES('rebuild');"))
         
         # Get count
         result = db.execute(text("SELECT COUNT(*) FROM ebooks_fts;"))
         count = result.scalar()
         
         db.commit()
+        invalidate_search_cache()
         logger.info(f"FTS index rebuilt with {count} documents")
         return count
     except Exception as e:
@@ -94,6 +120,37 @@ def rebuild_fts_index(db: Session) -> int:
         raise
 
 
+def disable_fts_triggers(db: Session) -> bool:
+    """
+    Drop the insert/update FTS triggers ahead of a bulk load.
+    
+    The index is stale until enable_fts_triggers() runs. Commits the session.
+    
+    Returns:
+        True if the triggers were dropped
+    """
+    try:
+        for trigger in FTS_WRITE_TRIGGERS:
+            db.execute(text(f"DROP TRIGGER IF EXISTS {trigger};"))
+        db.commit()
+        logger.info("FTS triggers disabled for bulk load")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not disable FTS triggers: {e}")
+        db.rollback()
+        return False
+
+
+def enable_fts_triggers(db: Session) -> None:
+    """
+    Recreate the FTS triggers and rebuild the index after a bulk load.
+    
+    init_fts() does both, since the triggers are missing. If the rebuild
+    fails, search falls back to LIKE and the next startup retries.
+    """
+    init_fts(db)
+
+
 class SearchResult:
     """Search result with relevance score"""
     def __init__(self, ebook: Ebook, score: float, snippet: Optional[str] = None):
@@ -102,6 +159,56 @@ class SearchResult:
         self.snippet = snippet
 
 
+# =============================================================================
+# SEARCH RESULT CACHE
+# =============================================================================
+# Ranked hits as (ebook_id, score, snippet) plus the total, keyed by the
+# search arguments. Any flushed or bulk-executed Ebook change clears it, and
+# so does its commit or rollback, so a hit never outlives the rows it was
+# computed from.
+
+SEARCH_CACHE_SIZE = 1024
+
+_search_cache: "OrderedDict[tuple, Tuple[List[Tuple[int, float, Optional[str]]], int]]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+_search_cache_version = 0
+
+
+def invalidate_search_cache() -> None:
+    """Drop all cached search results"""
+    global _search_cache_version
+    with _search_cache_lock:
+        _search_cache_version += 1
+        _search_cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_ebook_writes(session, flush_context):
+    if any(isinstance(obj, Ebook) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["ebooks_changed"] = True
+        invalidate_search_cache()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_ebook_statements(orm_execute_state):
+    # Bulk insert/update/delete statements bypass the flush
+    if (
+        (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete)
+        and orm_execute_state.bind_mapper is not None
+        and orm_execute_state.bind_mapper.class_ is Ebook
+    ):
+        orm_execute_state.session.info["ebooks_changed"] = True
+        invalidate_search_cache()
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _end_ebook_writes(session):
+    # Results cached while the change was uncommitted are stale either way
+    if session.info.pop("ebooks_changed", False):
+        invalidate_search_cache()
+
+
 def search_ebooks(
     db: Session,
     query: str,
@@ -113,6 +220,9 @@ def search_ebooks(
     """
     Search ebooks using FTS5 with optional filters.
     
+    Repeated searches (pagination, retyped queries) are answered from an
+    in-memory cache until the ebooks table changes.
+    
     Args:
         db: Database session
         query: Search query (supports FTS5 syntax)
@@ -131,69 +241,135 @@ def search_ebooks(
     # Sanitize query for FTS5 (escape special characters)
     safe_query = query.replace('"', '""').strip()
     
-    try:
-        # Build the search query
-        # Using MATCH for FTS5 with BM25 ranking
-        base_sql = """
-            SELECT e.*, bm25(ebooks_fts) AS score,
-                   snippet(ebooks_fts, 2, '<mark>', '</mark>', '...', 32) AS snippet
-            FROM ebooks_fts
-            JOIN ebooks e ON ebooks_fts.rowid = e.id
-            WHERE ebooks_fts MATCH :query
-        """
-        
-        count_sql = """
-            SELECT COUNT(*)
-            FROM ebooks_fts
-            JOIN ebooks e ON ebooks_fts.rowid = e.id
-            WHERE ebooks_fts MATCH :query
-        """
-        
-        params = {"query": safe_query}
-        
-        # Add filters
-        filters = []
-        if category:
-            filters.append("e.category = :category")
-            params["category"] = category
-        if format:
-            filters.append("e.file_format = :format")
-            params["format"] = format
-        
-        if filters:
-            filter_clause = " AND " + " AND ".join(filters)
-            base_sql += filter_clause
-            count_sql += filter_clause
-        
-        # Add ordering and pagination
-        base_sql += " ORDER BY score LIMIT :limit OFFSET :offset"
-        params["limit"] = limit
-        params["offset"] = offset
-        
-        # Execute search
-        results = db.execute(text(base_sql), params).fetchall()
-        
-        # Get total count
-        total = db.execute(text(count_sql), {k: v for k, v in params.items() if k not in ['limit', 'offset']}).scalar()
-        
-        # Convert to SearchResult objects
-        search_results = []
-        for row in results:
-            ebook = db.query(Ebook).filter(Ebook.id == row.id).first()
-            if ebook:
-                search_results.append(SearchResult(
-                    ebook=ebook,
-                    score=abs(row.score),  # BM25 returns negative scores
-                    snippet=row.snippet
-                ))
-        
-        logger.info(f"Search for '{query}' returned {len(search_results)} results (total: {total})")
-        return search_results, total or 0
+    key = (safe_query, category, format, limit, offset)
+    with _search_cache_lock:
+        version = _search_cache_version
+        cached = _search_cache.get(key)
+        if cached is not None:
+            _search_cache.move_to_end(key)
+    
+    if cached is not None:
+        hits, total = cached
+    else:
+        try:
+            try:
+                hits, total = _run_fts_search(db, safe_query, category, format, limit, offset)
+            except OperationalError as e:
+                if not _is_fts_query_error(e):
+                    raise
+                # Not valid FTS5 syntax ("C++", "dragon AND", "a-b"): search
+                # its words as plain terms instead of leaving FTS
+                terms_query = _fts_terms_query(query)
+                if not terms_query:
+                    return [], 0
+                logger.debug(f"FTS query syntax error ({e.orig}), retrying as {terms_query}")
+                hits, total = _run_fts_search(db, terms_query, category, format, limit, offset)
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            # Fall back to LIKE search if FTS itself is unavailable
+            return _fallback_search(db, query, category, format, limit, offset)
         
-    except Exception as e:
-        logger.error(f"Search failed: {e}")
-        # Fall back to LIKE search if FTS fails
-        return _fallback_search(db, query, category, format, limit, offset)
+        # Skip sessions with unflushed or uncommitted ebook changes: their
+        # view is not what other sessions see
+        if not db.info.get("ebooks_changed") and not db.new and not db.dirty and not db.deleted:
+            with _search_cache_lock:
+                if version == _search_cache_version:
+                    _search_cache[key] = (hits, total)
+                    while len(_search_cache) > SEARCH_CACHE_SIZE:
+                        _search_cache.popitem(last=False)
+    
+    # Load the matched ebooks in one query, then keep the ranked order
+    ids = [ebook_id for ebook_id, _, _ in hits]
+    ebooks = {e.id: e for e in db.query(Ebook).filter(Ebook.id.in_(ids))} if ids else {}
+    
+    # Convert to SearchResult objects
+    search_results = []
+    for ebook_id, score, snippet in hits:
+        ebook = ebooks.get(ebook_id)
+        if ebook:
+            search_results.append(SearchResult(
+                ebook=ebook,
+                score=score,
+                snippet=snippet
+            ))
+    
+    logger.info(f"Search for '{query}' returned {len(search_results)} results (total: {total})")
+    return search_results, total
+
+
+_FTS_TERM_RE = re.compile(r"\w+")
+
+
+def _fts_terms_query(query: str) -> str:
+    """
+    Rewrite free text as an FTS5 query of quoted terms, all required.
+    
+    Quoting each word strips it of operator meaning, so any input parses;
+    e.g. 'C++ primer: AND' -> '"c" "primer" "and"'.
+    """
+    return " ".join(f'"{term}"' for term in _FTS_TERM_RE.findall(query.lower()))
+
+
+def _is_fts_query_error(error: OperationalError) -> bool:
+    """True if SQLite rejected the MATCH expression itself (not a missing table)"""
+    message = str(error.orig)
+    return message.startswith("fts5:") or message.startswith("no such column")
+
+
+def _run_fts_search(
+    db: Session,
+    safe_query: str,
+    category: Optional[str],
+    format: Optional[str],
+    limit: int,
+    offset: int,
+) -> Tuple[List[Tuple[int, float, Optional[str]]], int]:
+    """Run the FTS5 page and count queries; returns ((id, score, snippet) hits, total)"""
+    # Build the search query
+    # Using MATCH for FTS5 with its rank column (BM25 by default)
+    base_sql = """
+        SELECT e.id, ebooks_fts.rank AS score,
+               snippet(ebooks_fts, 2, '<mark>', '</mark>', '...', 32) AS snippet
+        FROM ebooks_fts
+        JOIN ebooks e ON ebooks_fts.rowid = e.id
+        WHERE ebooks_fts MATCH :query
+    """
+    
+    count_sql = """
+        SELECT COUNT(*)
+        FROM ebooks_fts
+        JOIN ebooks e ON ebooks_fts.rowid = e.id
+        WHERE ebooks_fts MATCH :query
+    """
+    
+    params = {"query": safe_query}
+    
+    # Add filters
+    filters = []
+    if category:
+        filters.append("e.category = :category")
+        params["category"] = category
+    if format:
+        filters.append("e.file_format = :format")
+        params["format"] = format
+    
+    if filters:
+        filter_clause = " AND " + " AND ".join(filters)
+        base_sql += filter_clause
+        count_sql += filter_clause
+    
+    # Add ordering and pagination
+    base_sql += " ORDER BY ebooks_fts.rank LIMIT :limit OFFSET :offset"
+    
+    # Execute search
+    results = db.execute(text(base_sql), {**params, "limit": limit, "offset": offset}).fetchall()
+    
+    # Get total count
+    total = db.execute(text(count_sql), params).scalar()
+    
+    # BM25 returns negative scores
+    hits = [(row.id, abs(row.score), row.snippet) for row in results]
+    return hits, total or 0
 
 
 def _fallback_search(
@@ -233,14 +409,17 @@ def get_search_suggestions(db: Session, prefix: str, limit: int = 5) -> List[str
     
     pattern = f"{prefix}%"
     
+    # Plain LIKE: SQLite already matches ASCII case-insensitively, as ilike()'s
+    # lower() does, but on the bare column the NOCASE indexes can serve it
+    
     # Get title suggestions
     titles = db.query(Ebook.title).filter(
-        Ebook.title.ilike(pattern)
+        Ebook.title.like(pattern)
     ).distinct().limit(limit).all()
     
     # Get author suggestions
     authors = db.query(Ebook.author).filter(
-        Ebook.author.ilike(pattern)
+        Ebook.author.like(pattern)
     ).distinct().limit(limit).all()
     
     suggestions = list(set([t[0] for t in titles] + [a[0] for a in authors if a[0]]))
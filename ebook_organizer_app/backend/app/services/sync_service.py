@@ -6,12 +6,14 @@ Handles syncing local files and Google Drive files to the database.
 import os
 import logging
 import tempfile
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from app.models.database import Ebook, CloudConfig, SyncLog
 from app.models.schemas import SyncResponse
-from app.services.metadata_service import metadata_service
+from app.services.metadata_service import EbookMetadata, metadata_service
+from app.services.search_service import disable_fts_triggers, enable_fts_triggers
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,13 @@ class SyncService:
     """Service for synchronizing ebook libraries"""
     
     SUPPORTED_EXTENSIONS = {'.epub', '.pdf', '.mobi'}
+    _SUPPORTED_SUFFIXES = tuple(SUPPORTED_EXTENSIONS)
+    # Local sync commits every N files so the session and the final
+    # transaction stay small on large libraries
+    COMMIT_BATCH_SIZE = 500
+    # Once a local sync has written this many rows (and at least a fifth of
+    # the library), FTS triggers are dropped and the index rebuilt at the end
+    FTS_DEFER_MIN_ROWS = 500
 
     def __init__(self):
         self._status = {
@@ -79,23 +88,40 @@ class SyncService:
         logger.debug(f"SyncService scanning directory: {path}")
 
         start_time = datetime.now()
+        fts_deferred = False
         
         try:
-            for root, _, files in os.walk(path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    ext = os.path.splitext(file)[1].lower()
-                    
-                    if ext in self.SUPPORTED_EXTENSIONS:
-                        self._update_status(
-                            stage="processing file",
-                            current_file=file
-                        )
-                        await self._process_file(file_path, ext, db)
-                        self._status["books_processed"] += 1
+            defer_after = max(
+                self.FTS_DEFER_MIN_ROWS,
+                (db.query(func.count(Ebook.id)).scalar() or 0) // 5
+            )
+            batch = []
+            for entry in self._iter_files(path):
+                # Same result as splitext + set lookup (a bare ".epub" has
+                # no extension), without the per-file allocations
+                name = entry.name.lower()
+                
+                if name.endswith(self._SUPPORTED_SUFFIXES) and '.' in name.lstrip('.'):
+                    batch.append((entry, name[name.rindex('.'):]))
+                    if len(batch) >= self.COMMIT_BATCH_SIZE:
+                        await self._process_batch(batch, db, full_sync)
+                        db.commit()
+                        db.expunge_all()
+                        batch = []
                         
-            # Commit changes
+                        written = self._status["books_added"] + self._status["books_updated"]
+                        if not fts_deferred and written >= defer_after:
+                            fts_deferred = disable_fts_triggers(db)
+            
+            if batch:
+                await self._process_batch(batch, db, full_sync)
+                        
+            # Commit the remaining changes
             db.commit()
+            if fts_deferred:
+                fts_deferred = False
+                self._update_status(stage="rebuilding search index", current_file=None)
+                enable_fts_triggers(db)
             duration = (datetime.now() - start_time).total_seconds()
             
             self._update_status(
@@ -118,6 +144,8 @@ class SyncService:
         except Exception as e:
             logger.error(f"Sync failed: {e}")
             db.rollback()
+            if fts_deferred:
+                enable_fts_triggers(db)
             self._update_status(
                 is_active=False,
                 status="failed",
@@ -134,59 +162,181 @@ class SyncService:
                 error_message=str(e)
             )
 
-    async def _process_file(self, file_path: str, ext: str, db: Session):
-        """Process a single file: check exist, extract metadata, add to DB"""
+    @staticmethod
+    def _iter_files(root: str) -> Iterator[os.DirEntry]:
+        """Yield the non-directory entries under root, top-down like os.walk.
+        
+        DirEntry keeps what the directory listing already returned (and, on
+        Windows, the file's stat), so files need no extra stat round trip.
+        """
         try:
-            # simple duplicate check
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            return
+        
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Like os.walk, don't descend into symlinked directories
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            else:
+                yield entry
+        
+        for subdir in subdirs:
+            yield from SyncService._iter_files(subdir)
+
+    async def _process_batch(
+        self,
+        batch: List[Tuple[os.DirEntry, str]],
+        db: Session,
+        full_sync: bool = False
+    ):
+        """Process (entry, ext) pairs, parsing the new/changed ones concurrently.
+        
+        Only metadata extraction runs in parallel; all DB access stays on
+        this coroutine. With full_sync, unchanged files are re-parsed too.
+        """
+        pending = []
+        for entry, ext in batch:
+            self._update_status(
+                stage="processing file",
+                current_file=entry.name
+            )
+            checked = self._check_file(entry, db, full_sync)
+            if checked:
+                pending.append((entry.path, ext, *checked))
+            else:
+                self._status["books_processed"] += 1
+        
+        if not pending:
+            return
+        
+        # Extract metadata
+        self._update_status(stage="extracting metadata", current_file=None)
+        metadata_by_path = await metadata_service.read_many([item[0] for item in pending])
+        
+        new_rows = []
+        for file_path, ext, file_size, modified_at, existing in pending:
+            row = self._store_file(
+                file_path, ext, file_size, modified_at, existing,
+                metadata_by_path.get(file_path)
+            )
+            if row:
+                new_rows.append(row)
+            self._status["books_processed"] += 1
+        
+        if new_rows:
+            # Sync never reads the new objects back, so skip the ORM unit of
+            # work and insert the whole batch in one executemany
+            db.execute(insert(Ebook), new_rows)
+
+    def _check_file(self, entry: os.DirEntry, db: Session, full_sync: bool = False) -> Optional[tuple]:
+        """Return (file_size, modified_at, existing) if the file needs parsing.
+        
+        None means the file is unchanged (skipped) or could not be read.
+        full_sync re-parses known files even when their size and mtime match.
+        """
+        file_path = entry.path
+        try:
+            st = entry.stat()
+            file_size = st.st_size
+            modified_at = datetime.fromtimestamp(st.st_mtime)
+
+            # Duplicate check; an unchanged file is skipped before any parsing
             existing = db.query(Ebook).filter(Ebook.cloud_file_path == file_path).first()
-            if existing:
-                return
+            if existing and not full_sync:
+                if existing.cloud_modified_time is None:
+                    # Recorded before mtimes were kept: take the current
+                    # stat as the baseline instead of re-reading the file
+                    existing.cloud_modified_time = modified_at
+                    existing.file_size = file_size
+                if (
+                    existing.file_size == file_size
+                    and modified_at <= existing.cloud_modified_time
+                ):
+                    self._status["books_skipped"] += 1
+                    return None
+
+            return file_size, modified_at, existing
 
-            file_size = os.path.getsize(file_path)
-            
-            # Extract metadata
-            self._update_status(stage="extracting metadata")
-            metadata = await metadata_service.read_metadata(file_path)
-            
-            new_ebook = None
+        except Exception as e:
+            logger.error(f"Failed to process {file_path}: {e}")
+            self._status["books_failed"] += 1
+            return None
+
+    def _store_file(
+        self,
+        file_path: str,
+        ext: str,
+        file_size: int,
+        modified_at: datetime,
+        existing: Optional[Ebook],
+        metadata: Optional[EbookMetadata]
+    ) -> Optional[dict]:
+        """Refresh the record of a changed file, or return the row for a new one.
+        
+        New rows are returned rather than added so the batch can insert them
+        with one executemany INSERT.
+        """
+        try:
+            if existing:
+                # File changed on disk: refresh the existing record
+                if metadata:
+                    existing.title = metadata.title or existing.title
+                    existing.author = metadata.author or existing.author
+                    existing.description = metadata.description or existing.description
+                    existing.publisher = metadata.publisher or existing.publisher
+                    existing.language = metadata.language or existing.language
+                    existing.published_date = metadata.date or existing.published_date
+                existing.file_size = file_size
+                existing.last_synced = datetime.now()
+                existing.cloud_modified_time = modified_at
+                existing.sync_status = "synced"
+                self._status["books_updated"] += 1
+                return None
+
+            row = dict(
+                title=os.path.basename(file_path),
+                author=None,
+                description=None,
+                publisher=None,
+                language=None,
+                published_date=None,
+                category=None,
+                file_format=ext.lstrip('.'),
+                file_size=file_size,
+                cloud_provider="local",
+                cloud_file_id=file_path,
+                cloud_file_path=file_path,
+                is_synced=True,
+                sync_status="synced",
+                last_synced=datetime.now(),
+                cloud_modified_time=modified_at
+            )
             if metadata:
-                new_ebook = Ebook(
-                    title=metadata.title or os.path.basename(file_path),
+                row.update(
+                    title=metadata.title or row["title"],
                     author=metadata.author or "Unknown",
                     description=metadata.description,
                     publisher=metadata.publisher,
                     language=metadata.language,
                     published_date=metadata.date,
-                    category=metadata.subjects[0] if metadata.subjects else None,
-                    file_format=ext.lstrip('.'),
-                    file_size=file_size,
-                    cloud_provider="local",
-                    cloud_file_id=file_path,
-                    cloud_file_path=file_path,
-                    is_synced=True,
-                    sync_status="synced",
-                    last_synced=datetime.now()
-                )
-            else:
-                 # Minimal info fallback
-                new_ebook = Ebook(
-                    title=os.path.basename(file_path),
-                    file_format=ext.lstrip('.'),
-                    file_size=file_size,
-                    cloud_provider="local",
-                    cloud_file_id=file_path,
-                    cloud_file_path=file_path,
-                    is_synced=True,
-                    sync_status="synced",
-                    last_synced=datetime.now()
+                    category=metadata.subjects[0] if metadata.subjects else None
                 )
             
-            db.add(new_ebook)
             self._status["books_added"] += 1
+            return row
 
         except Exception as e:
             logger.error(f"Failed to process {file_path}: {e}")
             self._status["books_failed"] += 1
+            return None
 
     # ----- Google Drive sync -------------------------------------------
 
@@ -8,6 +8,7 @@ Ported from: online-library-organizer/ebook_organizer.py
 """
 
 import re
+from functools import lru_cache
 from typing import Tuple, Optional
 from pathlib import Path
 
@@ -276,6 +277,9 @@ FOLDER_TO_TAXONOMY = {
     'encyclopedia': ('Reference', 'Encyclopedias'),
 }
 
+# FOLDER_TO_TAXONOMY keys lowercased once, in dict order, for partial matches
+_FOLDER_KEY_PAIRS = tuple((key.lower(), genre) for key, genre in FOLDER_TO_TAXONOMY.items())
+
 # Blacklist patterns for genre values (used before taxonomy lookup)
 GENRE_BLACKLIST_PATTERNS = [
     r'^https?',           # URLs
@@ -287,6 +291,11 @@ GENRE_BLACKLIST_PATTERNS = [
     r' -- ',              # Library of Congress format
 ]
 
+# Blacklist patterns folded into one regex, tried in a single match call
+_GENRE_BLACKLIST_RE = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in GENRE_BLACKLIST_PATTERNS), re.IGNORECASE
+)
+
 # Keywords in title/filename that hint at category
 TITLE_KEYWORDS = {
     ('Fiction', 'Science Fiction'): ['sci-fi', 'starship', 'alien invasion', 'space station'],
@@ -303,53 +312,177 @@ TITLE_KEYWORDS = {
     ('Comics & Graphic Novels', 'Indian Comics'): ['amar chitra katha', 'panchatantra tales'],
 }
 
+# TITLE_KEYWORDS flattened and lowercased once, in dict order
+_TITLE_KEYWORD_PAIRS = tuple(
+    (keyword.lower(), genre)
+    for genre, keywords in TITLE_KEYWORDS.items()
+    for keyword in keywords
+)
+
+
+# Authors and series whose genre is unambiguous, checked before the Open
+# Library lookup so obvious books need no network round trip
+KNOWN_AUTHORS = {
+    # Fantasy
+    'Brandon Sanderson': ('Fiction', 'Fantasy'),
+    'J.R.R. Tolkien': ('Fiction', 'Fantasy'),
+    'Terry Pratchett': ('Fiction', 'Fantasy'),
+    'Robert Jordan': ('Fiction', 'Fantasy'),
+    'George R.R. Martin': ('Fiction', 'Fantasy'),
+    'Patrick Rothfuss': ('Fiction', 'Fantasy'),
+    'Joe Abercrombie': ('Fiction', 'Fantasy'),
+    'Robin Hobb': ('Fiction', 'Fantasy'),
+    
+    # Science Fiction
+    'Arthur C. Clarke': ('Fiction', 'Science Fiction'),
+    'Philip K. Dick': ('Fiction', 'Science Fiction'),
+    'Frank Herbert': ('Fiction', 'Science Fiction'),
+    'Iain M. Banks': ('Fiction', 'Science Fiction'),
+    'Alastair Reynolds': ('Fiction', 'Science Fiction'),
+    'Cixin Liu': ('Fiction', 'Science Fiction'),
+    
+    # Mystery & Thriller
+    'Agatha Christie': ('Fiction', 'Mystery & Thriller'),
+    'Arthur Conan Doyle': ('Fiction', 'Mystery & Thriller'),
+    'Raymond Chandler': ('Fiction', 'Mystery & Thriller'),
+    'Dashiell Hammett': ('Fiction', 'Mystery & Thriller'),
+    'Lee Child': ('Fiction', 'Mystery & Thriller'),
+    'Michael Connelly': ('Fiction', 'Mystery & Thriller'),
+    'Harlan Coben': ('Fiction', 'Mystery & Thriller'),
+    
+    # Horror
+    'H.P. Lovecraft': ('Fiction', 'Horror'),
+    'Clive Barker': ('Fiction', 'Horror'),
+    
+    # Romance
+    'Nora Roberts': ('Fiction', 'Romance'),
+    'Nicholas Sparks': ('Fiction', 'Romance'),
+    'Danielle Steel': ('Fiction', 'Romance'),
+}
+
+KNOWN_SERIES = {
+    'harry potter': ('Fiction', 'Fantasy'),
+    'discworld': ('Fiction', 'Fantasy'),
+    'wheel of time': ('Fiction', 'Fantasy'),
+    'song of ice and fire': ('Fiction', 'Fantasy'),
+    'mistborn': ('Fiction', 'Fantasy'),
+    'stormlight archive': ('Fiction', 'Fantasy'),
+    'star wars': ('Fiction', 'Science Fiction'),
+    'star trek': ('Fiction', 'Science Fiction'),
+    'sherlock holmes': ('Fiction', 'Mystery & Thriller'),
+    'hercule poirot': ('Fiction', 'Mystery & Thriller'),
+    'jack reacher': ('Fiction', 'Mystery & Thriller'),
+}
+
+
+# A series only counts when the title starts with its name (after an
+# optional article), so "The Science of Star Wars" is not a Star Wars novel
+_KNOWN_SERIES_RE = re.compile(
+    r'^(?:(?:the|a|an) )?('
+    + '|'.join(re.escape(series) for series in sorted(KNOWN_SERIES, key=len, reverse=True))
+    + r')\b'
+)
+
+# Words marking a book about a series rather than part of it
+# ("Sherlock Holmes: a critical study")
+_REFERENCE_WORK_RE = re.compile(
+    r'\b(?:stud(?:y|ies)|guide|companion|encyclopedia|handbook|history|science'
+    r'|analysis|criticism|essays?|philosophy|making of|art of)\b'
+)
+
+# Runs of punctuation, underscores and spaces in titles and filenames
+_NON_WORD_RE = re.compile(r'[\W_]+')
+
+_NON_LETTER_RE = re.compile(r'[^a-z]')
+
+
+def _author_key(author: str) -> str:
+    """Letters only, so "J. R. R. Tolkien" and "JRR Tolkien" look alike"""
+    return _NON_LETTER_RE.sub('', author.lower())
+
+
+_KNOWN_AUTHOR_KEYS = {_author_key(author): genre for author, genre in KNOWN_AUTHORS.items()}
+
+
+def _build_genre_index():
+    """
+    Flatten TAXONOMY for classify_genre.
+    
+    Subgenres are numbered in TAXONOMY order ("Other" excluded) so the
+    first subgenre to match still wins. Returns a dict of exact
+    names/aliases -> (category, subgenre), and the ordered (alias, genre)
+    pairs long enough for a partial match.
+    
+    An exact hit is resolved here against the partial aliases of earlier
+    subgenres, which would have matched first, so lookups can return it
+    directly.
+    """
+    subgenres = []
+    exact = {}
+    partial = []
+    for category, subs in TAXONOMY.items():
+        for subgenre, aliases in subs.items():
+            if subgenre == "Other":
+                continue
+            order = len(subgenres)
+            subgenres.append((category, subgenre))
+            exact.setdefault(subgenre.lower(), order)
+            for alias in aliases:
+                exact.setdefault(alias.lower(), order)
+                if len(alias) > 4:
+                    partial.append((order, alias.lower()))
+    
+    def first_match(key, order):
+        for earlier, alias in partial:
+            if earlier >= order:
+                break
+            if alias in key:
+                return earlier
+        return order
+    
+    resolved = {key: subgenres[first_match(key, order)] for key, order in exact.items()}
+    return resolved, tuple((alias, subgenres[order]) for order, alias in partial)
+
+
+_GENRE_EXACT, _GENRE_PARTIAL = _build_genre_index()
 
 # =============================================================================
 # CLASSIFICATION FUNCTIONS
 # =============================================================================
 
+@lru_cache(maxsize=4096)
 def classify_genre(raw_genre: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
     """
     Classify a raw genre string into the canonical taxonomy (case-insensitive).
     
+    Memoized: genre strings repeat heavily across a library.
+    
     Args:
         raw_genre: Raw genre string from embedded metadata
         
     Returns:
         tuple: (Category, SubGenre) or (None, None) if not classifiable
     """
-    if not raw_genre:
+    # Too long - likely a description, not a genre
+    if not raw_genre or len(raw_genre) > 50:
+        return None, None
+    
+    # Check against blacklist patterns
+    if _GENRE_BLACKLIST_RE.match(raw_genre):
         return None, None
     
     # Normalize to lowercase for case-insensitive matching
     genre_lower = raw_genre.lower().strip()
     
-    # Check against blacklist patterns first
-    for pattern in GENRE_BLACKLIST_PATTERNS:
-        if re.match(pattern, raw_genre, re.IGNORECASE):
-            return None, None
-    
-    # Too long - likely a description, not a genre
-    if len(raw_genre) > 50:
-        return None, None
+    # Exact name/alias match - the common case for embedded metadata
+    genre = _GENRE_EXACT.get(genre_lower)
+    if genre:
+        return genre
     
-    # Search through taxonomy for a match
-    for category, subgenres in TAXONOMY.items():
-        for subgenre, aliases in subgenres.items():
-            if subgenre == "Other":
-                continue  # Skip "Other" - it's a fallback only
-            
-            # Check if raw genre matches subgenre name
-            if genre_lower == subgenre.lower():
-                return category, subgenre
-            
-            # Check if raw genre matches any alias
-            for alias in aliases:
-                if genre_lower == alias.lower():
-                    return category, subgenre
-                # Partial match - genre contains alias (for compound genres)
-                if alias.lower() in genre_lower and len(alias) > 4:
-                    return category, subgenre
+    # Partial match - genre contains alias (for compound genres)
+    for alias, genre in _GENRE_PARTIAL:
+        if alias in genre_lower:
+            return genre
     
     # Special handling for broad categories
     if 'fiction' in genre_lower and 'non' not in genre_lower:
@@ -370,17 +503,39 @@ def classify_from_folder(filepath: Path) -> Tuple[Optional[str], Optional[str]]:
     Returns:
         tuple: (Category, SubGenre) or (None, None) if not found
     """
-    for parent in filepath.parents:
-        folder_name = parent.name.lower()
-        
-        # Direct match in folder mapping (case-insensitive)
-        if folder_name in FOLDER_TO_TAXONOMY:
-            return FOLDER_TO_TAXONOMY[folder_name]
-        
-        # Partial match - folder contains key (case-insensitive)
-        for key, (category, subgenre) in FOLDER_TO_TAXONOMY.items():
-            if key.lower() in folder_name:
-                return category, subgenre
+    # Only the parent folders matter, so all files in a folder share one cache entry
+    return _classify_folder(str(filepath.parent))
+
+
+@lru_cache(maxsize=2048)
+def _classify_folder(folder: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Classify from a folder and its ancestors (memoized per folder).
+    
+    The closest folder containing any key decides. Folder names are joined
+    into one string (root first) so each key is searched once for its
+    closest occurrence rather than once per folder.
+    """
+    folder_path = Path(folder)
+    names = folder_path.parts[1:] if folder_path.anchor else folder_path.parts
+    path_lower = "\0".join(names).lower()
+    
+    closest = max(path_lower.rfind(key) for key, _ in _FOLDER_KEY_PAIRS)
+    if closest < 0:
+        return None, None
+    
+    start = path_lower.rfind("\0", 0, closest) + 1
+    end = path_lower.find("\0", closest)
+    folder_name = path_lower[start:end] if end >= 0 else path_lower[start:]
+    
+    # Direct match in folder mapping (case-insensitive)
+    if folder_name in FOLDER_TO_TAXONOMY:
+        return FOLDER_TO_TAXONOMY[folder_name]
+    
+    # Partial match - folder contains key (case-insensitive)
+    for key, genre in _FOLDER_KEY_PAIRS:
+        if key in folder_name:
+            return genre
     
     return None, None
 
@@ -400,10 +555,36 @@ def classify_from_title(title: Optional[str]) -> Tuple[Optional[str], Optional[s
     
     title_lower = title.lower()
     
-    for (category, subgenre), keywords in TITLE_KEYWORDS.items():
-        for keyword in keywords:
-            # Case-insensitive keyword matching
-            if keyword.lower() in title_lower:
-                return category, subgenre
+    for keyword, genre in _TITLE_KEYWORD_PAIRS:
+        if keyword in title_lower:
+            return genre
+    
+    return None, None
+
+
+def classify_from_known_work(
+    title: Optional[str],
+    author: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Classify from a known author, then a known series in the title.
+    
+    Args:
+        title: Book title or filename
+        author: Author name
+        
+    Returns:
+        tuple: (Category, SubGenre) or (None, None) if not known
+    """
+    if author:
+        genre = _KNOWN_AUTHOR_KEYS.get(_author_key(author))
+        if genre:
+            return genre
+    
+    if title:
+        words = _NON_WORD_RE.sub(' ', title.lower()).strip()
+        match = _KNOWN_SERIES_RE.match(words)
+        if match and not _REFERENCE_WORK_RE.search(words):
+            return KNOWN_SERIES[match.group(1)]
     
     return None, None
@@ -28,6 +28,7 @@ a = Analysis(
         'uvicorn.loops',
         'uvicorn.loops.auto',
         'uvicorn.loops.asyncio',
+        'uvicorn.loops.uvloop',
         'uvicorn.protocols',
         'uvicorn.protocols.http',
         'uvicorn.protocols.http.auto',
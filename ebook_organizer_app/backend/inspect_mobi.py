@@ -1,12 +1,29 @@
+"""
+Dev probe: check whether the optional `mobi` package is importable.
+
+Run directly with `python inspect_mobi.py`; importing this module has no
+side effects.
+"""
+
+
+def probe_mobi() -> bool:
+    """Report on the `mobi` package and return True if its Mobi class imports."""
+    try:
+        import mobi
+    except ImportError:
+        print("Mobi package not found.")
+        return False
 
-try:
-    import mobi
     print("Mobi package found.")
     print(f"Dir: {dir(mobi)}")
     try:
         from mobi import Mobi
         print("Successfully imported Mobi class.")
+        return True
     except ImportError as e:
         print(f"Failed to import Mobi class: {e}")
-except ImportError:
-    print("Mobi package not found.")
+        return False
+
+
+if __name__ == "__main__":
+    probe_mobi()
@@ -39,7 +39,9 @@ if __name__ == "__main__":
             port=port,
             reload=False,  # Cannot reload frozen executable
             log_level="info",
-            access_log=True,
+            # RequestLoggingMiddleware already logs every request with its
+            # request ID and timing; uvicorn's access log would duplicate it
+            access_log=False,
         )
     else:
         # Development mode: enable reload for faster development
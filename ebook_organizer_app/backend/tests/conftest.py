@@ -5,12 +5,15 @@ Pytest fixtures and configuration for Ebook Organizer Backend tests
 import pytest
 from typing import Generator, AsyncGenerator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.models.database import Base, get_db
+from app.models.database import Base
+from app.services import openlibrary_service
+from app.services.database import get_db
 
 
 # Create in-memory SQLite database for testing
@@ -22,33 +25,79 @@ test_engine = create_engine(
     poolclass=StaticPool,
 )
 
+
+# pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit
+# BEGIN itself so each test can run inside an outer transaction.
+@event.listens_for(test_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=test_engine
+    join_transaction_mode="create_savepoint",
 )
 
 
+@pytest.fixture(scope="session")
+def engine() -> Engine:
+    """The test engine, with all tables created once for the whole test run."""
+    Base.metadata.create_all(bind=test_engine)
+    return test_engine
+
+
 @pytest.fixture(scope="function")
-def db_session() -> Generator[Session, None, None]:
+def db_session(engine: Engine) -> Generator[Session, None, None]:
     """
     Create a fresh database session for each test.
-    Tables are created before and dropped after each test.
+    The session runs inside an outer transaction that is rolled back
+    afterwards, so commits made by the test never persist.
     """
-    # Create all tables
-    Base.metadata.create_all(bind=test_engine)
-    
-    session = TestingSessionLocal()
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection)
     try:
         yield session
     finally:
         session.close()
-        # Drop all tables after test
-        Base.metadata.drop_all(bind=test_engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def openlibrary_cache(tmp_path, monkeypatch) -> Generator[None, None, None]:
+    """
+    Give each test an empty Open Library cache, with the disk cache in
+    tmp_path instead of the source tree.
+    """
+    monkeypatch.setattr(
+        openlibrary_service, "API_DISK_CACHE_PATH", tmp_path / "openlibrary_cache.sqlite"
+    )
+    openlibrary_service.close_disk_cache()
+    openlibrary_service.API_CACHE.clear()
+    yield
+    openlibrary_service.close_disk_cache()
+    openlibrary_service.API_CACHE.clear()
+
+
+@pytest.fixture(scope="session")
+def app_client() -> Generator[TestClient, None, None]:
+    """
+    A single test client for the whole run, so the app's startup and
+    shutdown only happen once.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db_session: Session) -> Generator[TestClient, None, None]:
+def client(app_client: TestClient, db_session: Session) -> Generator[TestClient, None, None]:
     """
     Create a test client with overridden database dependency.
     """
@@ -59,11 +108,10 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
             pass
     
     app.dependency_overrides[get_db] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    app.dependency_overrides.clear()
+    try:
+        yield app_client
+    finally:
+        app.dependency_overrides.clear()
 
 
 # =============================================================================
@@ -0,0 +1,76 @@
+"""
+Unit tests for local file reorganization
+"""
+
+import os
+
+import pytest
+
+from app.config import settings
+from app.models.database import Ebook
+from app.services.file_organizer_service import execute_reorganization, generate_reorganize_plan
+
+
+@pytest.fixture
+def twins(db_session, tmp_path):
+    """Two classified books in different folders that share a filename"""
+    ebooks = []
+    for folder in ("first", "second"):
+        source = tmp_path / "incoming" / folder / "Dune.epub"
+        source.parent.mkdir(parents=True)
+        source.write_text(f"copy from {folder}")
+        ebooks.append(Ebook(
+            title="Dune", author="Frank Herbert", category="Fiction", sub_genre="Science Fiction",
+            cloud_provider="local", cloud_file_id=str(source), cloud_file_path=str(source),
+        ))
+    db_session.add_all(ebooks)
+    db_session.commit()
+    return ebooks
+
+
+class TestExecuteReorganization:
+    """Test local move/copy execution"""
+
+    @pytest.mark.parametrize("workers", [8, 1])
+    def test_copies_sharing_a_target_get_distinct_names(self, db_session, tmp_path, twins, monkeypatch, workers):
+        """Queued (or sequential) copies don't overwrite each other"""
+        monkeypatch.setattr(settings, "REORGANIZE_COPY_WORKERS", workers)
+        library = tmp_path / "library"
+
+        result = execute_reorganization(db_session, destination=str(library), operation="copy")
+
+        assert result.succeeded == 2
+        assert result.failed == 0
+        folder = library / "Fiction" / "Science Fiction" / "Frank Herbert"
+        assert sorted(os.listdir(folder)) == ["Dune (1).epub", "Dune.epub"]
+
+        # Each source maps to its own copy, with its own contents
+        targets = {result.path_mappings[ebook.cloud_file_path] for ebook in twins}
+        assert len(targets) == 2
+        for ebook in twins:
+            copied = result.path_mappings[ebook.cloud_file_path]
+            assert open(copied).read() == open(ebook.cloud_file_path).read()
+
+        # Copying leaves the sources and their database paths alone
+        assert all(os.path.isfile(ebook.cloud_file_path) for ebook in twins)
+        assert all(str(tmp_path / "incoming") in ebook.cloud_file_path for ebook in twins)
+
+    @pytest.mark.parametrize("blank", ["\t", "\n", " \r\n "])
+    def test_whitespace_only_genres_are_unclassified(self, db_session, tmp_path, blank):
+        """Rows _is_classified rejects are not fetched as classified"""
+        source = tmp_path / "incoming" / "Blank.epub"
+        source.parent.mkdir(parents=True)
+        source.write_text("blank")
+        db_session.add(Ebook(
+            title="Blank", category=blank, sub_genre="Fantasy",
+            cloud_provider="local", cloud_file_id=str(source), cloud_file_path=str(source),
+        ))
+        db_session.commit()
+
+        plan = generate_reorganize_plan(db_session, destination=str(tmp_path / "library"))
+        assert plan.total_files == 0
+
+        result = execute_reorganization(db_session, destination=str(tmp_path / "library"))
+        assert result.total_processed == 0
+        assert source.is_file()
+        assert not (tmp_path / "library").exists()
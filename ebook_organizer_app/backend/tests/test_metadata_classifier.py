@@ -10,8 +10,10 @@ from app.services.metadata_classifier import (
     clean_author_name,
     extract_from_filename,
     classify_book,
+    classify_books,
     ClassificationResult
 )
+from app.services import metadata_classifier
 
 
 class TestIsPrintableText:
@@ -138,6 +140,11 @@ class TestExtractFromFilename:
         result = extract_from_filename(path)
         assert result == "Isaac Asimov"
     
+    def test_falls_back_to_later_pattern(self):
+        """Test that a rejected first match falls through to later patterns"""
+        path = Path("/library/admin - Foundation (Isaac Asimov).epub")
+        assert extract_from_filename(path) == "Isaac Asimov"
+    
     def test_no_pattern_match(self):
         """Test when no pattern matches"""
         path = Path("/library/randombook.epub")
@@ -203,5 +210,147 @@ class TestClassifyBook:
         # May have None values for category/subgenre/author
 
 
+@pytest.fixture
+def lookups(monkeypatch):
+    """Stub Open Library lookups: records (path, author, network) per call.
+    
+    Books whose title contains "Harbor" come back as Mystery, the rest unknown.
+    """
+    calls = []
+
+    def lookup(filepath, author, network):
+        calls.append((filepath, author, network))
+        if "Harbor" in filepath:
+            return "Api Author", "Fiction", "Mystery"
+        return None, None, None
+
+    monkeypatch.setattr(metadata_classifier, "lookup_book_metadata", lookup)
+    return calls
+
+
+class TestClassifyBooks:
+    """Test batch classification with concurrent lookups"""
+    
+    def test_results_follow_input_order(self, lookups):
+        """Results line up with items whichever step classified them"""
+        items = [
+            (Path("/library/misc/Quiet Harbor.epub"), None, None),
+            (Path("/library/fantasy/book.epub"), None, None),
+            (Path("/library/misc/Blue Lantern.epub"), None, "Ursula K. Le Guin"),
+            (Path("/library/random/book.epub"), "Science Fiction", None),
+        ]
+        results = classify_books(items)
+        
+        assert [(r.sub_genre, r.metadata_source) for r in results] == [
+            ("Mystery", "api"),
+            ("Fantasy", "folder"),
+            (None, "embedded"),
+            ("Science Fiction", "embedded"),
+        ]
+        assert results[0].author == "Api Author"
+        assert results[2].author == "Ursula K. Le Guin"
+        # Only the two books left unclassified locally were looked up
+        assert sorted(call[0] for call in lookups) == [
+            "/library/misc/Blue Lantern.epub",
+            "/library/misc/Quiet Harbor.epub",
+        ]
+    
+    def test_matches_classify_book(self, lookups):
+        """A batch gives the same answers as classifying one at a time"""
+        items = [
+            (Path("/library/misc/Quiet Harbor.epub"), None, "Jane Doe"),
+            (Path("/library/Isaac Asimov - Blue Lantern.epub"), None, None),
+            (Path("/library/history/book.epub"), None, None),
+        ]
+        assert classify_books(items) == [classify_book(*item) for item in items]
+    
+    def test_repeated_keys_are_looked_up_once(self, lookups):
+        """Books sharing a path and author share one lookup"""
+        items = [
+            (Path("/library/misc/Quiet Harbor.epub"), None, None),
+            (Path("/library/misc/Quiet Harbor.epub"), None, None),
+            (Path("/library/misc/Quiet Harbor.epub"), None, "Jane Doe"),
+        ]
+        results = classify_books(items)
+        
+        assert len(lookups) == 2
+        assert all(r.sub_genre == "Mystery" for r in results)
+        # Each book still gets its own result object
+        assert results[0] is not results[1]
+    
+    def test_network_flag_is_passed_through(self, lookups):
+        """network=False reaches every lookup so only cached answers are used"""
+        items = [
+            (Path("/library/misc/Quiet Harbor.epub"), None, None),
+            (Path("/library/misc/Blue Lantern.epub"), None, None),
+        ]
+        classify_books(items, network=False)
+        
+        assert len(lookups) == 2
+        assert all(network is False for _, _, network in lookups)
+    
+    def test_nothing_to_look_up(self, lookups):
+        assert classify_books([]) == []
+        assert classify_books([(Path("/library/fantasy/book.epub"), None, None)])[0].sub_genre == "Fantasy"
+        assert lookups == []
+    
+    def test_failed_lookup(self, monkeypatch):
+        """A failing lookup raises, or with return_exceptions only fails its own books"""
+        def lookup(filepath, author, network):
+            if "Broken" in filepath:
+                raise RuntimeError("lookup exploded")
+            return None, "Fiction", "Mystery"
+        
+        monkeypatch.setattr(metadata_classifier, "lookup_book_metadata", lookup)
+        items = [
+            (Path("/library/misc/Broken Record.epub"), None, None),
+            (Path("/library/misc/Quiet Harbor.epub"), None, None),
+        ]
+        
+        with pytest.raises(RuntimeError):
+            classify_books(items)
+        
+        broken, ok = classify_books(items, return_exceptions=True)
+        assert isinstance(broken, RuntimeError)
+        assert ok.sub_genre == "Mystery"
+    
+    @pytest.mark.parametrize("name, author, sub_genre", [
+        ("Brandon Sanderson - The Way of Kings.epub", "Brandon Sanderson", "Fantasy"),
+        ("Agatha Christie - Murder on the Orient Express.pdf", "Agatha Christie", "Mystery & Thriller"),
+        ("J.K. Rowling - Harry Potter and the Chamber of Secrets.epub", "J.K. Rowling", "Fantasy"),
+        ("Timothy Zahn - Star Wars Heir to the Empire.epub", "Timothy Zahn", "Science Fiction"),
+    ])
+    def test_author_dash_title_known_work(self, lookups, name, author, sub_genre):
+        """Known authors and series in "Author - Title" filenames skip the lookup"""
+        result = classify_book(Path("/library/misc") / name)
+        
+        assert (result.category, result.sub_genre) == ("Fiction", sub_genre)
+        assert result.author == author
+        assert result.metadata_source == "known"
+        assert lookups == []
+    
+    def test_author_dash_title_known_work_after_api_miss(self, lookups):
+        """An Open Library miss for another book does not change the local answer"""
+        items = [
+            (Path("/library/misc/Jane Doe - Blue Lantern.epub"), None, None),
+            (Path("/library/misc/Brandon Sanderson - The Way of Kings.epub"), None, None),
+            (Path("/library/misc/Timothy Zahn - Star Wars Heir to the Empire.epub"), None, None),
+        ]
+        missed, kings, zahn = classify_books(items, network=False)
+        
+        assert [call[0] for call in lookups] == ["/library/misc/Jane Doe - Blue Lantern.epub"]
+        assert missed.category is None
+        assert missed.author == "Jane Doe"
+        assert (kings.sub_genre, kings.metadata_source) == ("Fantasy", "known")
+        assert (zahn.sub_genre, zahn.metadata_source) == ("Science Fiction", "known")
+    
+    def test_series_after_author_is_anchored_to_title(self, lookups):
+        """The title part, not the whole stem, must start with the series"""
+        result = classify_book(Path("/library/misc/Jane Doe - The Science of Star Wars.epub"))
+        
+        assert result.category is None
+        assert len(lookups) == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,348 @@
+"""
+Unit tests for metadata service readers and writers
+"""
+
+import os
+import struct
+import zipfile
+
+import pytest
+from ebooklib import epub
+from pypdf import PdfReader, PdfWriter
+
+from app.services.metadata_service import EbookMetadata, MetadataService
+
+
+@pytest.fixture
+def service() -> MetadataService:
+    return MetadataService()
+
+
+def _make_epub(path, title="The Left Hand of Darkness", author="Ursula K. Le Guin"):
+    """Write an EPUB with ebooklib carrying the usual Dublin Core fields"""
+    book = epub.EpubBook()
+    book.set_identifier("urn:isbn:9780441478125")
+    book.set_title(title)
+    book.set_language("en")
+    book.add_author(author)
+    book.add_metadata("DC", "description", "Winter on the planet Gethen")
+    book.add_metadata("DC", "publisher", "Ace Books")
+    book.add_metadata("DC", "date", "1969-03-01")
+    book.add_metadata("DC", "subject", "Science Fiction")
+    book.add_metadata("DC", "subject", "Classics")
+    chapter = epub.EpubHtml(title="One", file_name="one.xhtml", content="<p>Text</p>")
+    book.add_item(chapter)
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = [chapter]
+    epub.write_epub(str(path), book)
+    return path
+
+
+def _replace_in_epub(path, member, content):
+    """Rewrite one zip member (None removes it)"""
+    with zipfile.ZipFile(path) as z:
+        entries = [(info, z.read(info.filename)) for info in z.infolist()]
+    with zipfile.ZipFile(path, "w") as z:
+        for info, data in entries:
+            if info.filename == member:
+                if content is None:
+                    continue
+                data = content
+            z.writestr(info, data)
+
+
+def _make_pdf(path, pages=3, owner_password=None):
+    """Write a small blank PDF, optionally encrypted with an empty user password"""
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(200, 200)
+    if owner_password:
+        writer.encrypt(user_password="", owner_password=owner_password)
+    writer.write(str(path))
+    return path.read_bytes()
+
+
+class TestAppendPdfInfo:
+    """Test incremental /Info updates on PDFs"""
+
+    def test_appends_without_touching_original_bytes(self, service, tmp_path):
+        """Each update only adds bytes after the existing file"""
+        path = tmp_path / "book.pdf"
+        original = _make_pdf(path)
+
+        assert service._append_pdf_info(str(path), {"/Title": "First"}) is True
+        first = path.read_bytes()
+        assert len(first) > len(original)
+        assert first[:len(original)] == original
+        assert PdfReader(str(path)).metadata["/Title"] == "First"
+
+        assert service._append_pdf_info(str(path), {"/Title": "Second", "/Author": "A. Writer"}) is True
+        second = path.read_bytes()
+        assert second[:len(first)] == first
+
+        metadata = PdfReader(str(path)).metadata
+        assert metadata["/Title"] == "Second"
+        assert metadata["/Author"] == "A. Writer"
+        assert len(PdfReader(str(path)).pages) == 3
+
+    def test_unchanged_metadata_appends_nothing(self, service, tmp_path):
+        """Repeating an update is a no-op rather than an error"""
+        path = tmp_path / "book.pdf"
+        _make_pdf(path)
+        service._append_pdf_info(str(path), {"/Title": "Same"})
+        updated = path.read_bytes()
+
+        assert service._append_pdf_info(str(path), {"/Title": "Same"}) is True
+        assert path.read_bytes() == updated
+
+    def test_encrypted_pdf_is_left_alone(self, service, tmp_path):
+        """Encrypted PDFs are not updated incrementally"""
+        path = tmp_path / "locked.pdf"
+        original = _make_pdf(path, owner_password="owner")
+
+        assert service._append_pdf_info(str(path), {"/Title": "New"}) is False
+        assert path.read_bytes() == original
+
+    def test_encrypted_pdf_falls_back_to_full_rewrite(self, service, tmp_path):
+        """_write_pdf_metadata rewrites encrypted PDFs it can open"""
+        path = tmp_path / "locked.pdf"
+        original = _make_pdf(path, owner_password="owner")
+
+        assert service._write_pdf_metadata(str(path), EbookMetadata(title="Rewritten")) is True
+
+        written = path.read_bytes()
+        assert not written.startswith(original)
+        reader = PdfReader(str(path))
+        if reader.is_encrypted:
+            reader.decrypt("")
+        assert reader.metadata["/Title"] == "Rewritten"
+        assert len(reader.pages) == 3
+
+
+def _make_mobi(
+    path,
+    db_name=b"Palm_Name",
+    full_name="Full Name",
+    exth=(),
+    encoding=65001,
+    exth_flag=True,
+    db_type=b"BOOKMOBI",
+    truncate=None,
+):
+    """Write a minimal PalmDB/MOBI file.
+    
+    exth is a sequence of (record type, str) pairs; strings are encoded with
+    the codec matching the encoding code.
+    """
+    codec = {65001: "utf-8", 1252: "cp1252"}[encoding]
+    rec0_offset = 88
+    mobi_len = 232
+
+    exth_records = b"".join(
+        struct.pack(">II", rec_type, 8 + len(data)) + data
+        for rec_type, data in ((t, v.encode(codec)) for t, v in exth)
+    )
+    exth_block = b"EXTH" + struct.pack(">II", 12 + len(exth_records), len(exth)) + exth_records
+    name = full_name.encode(codec)
+    name_offset = 16 + mobi_len + len(exth_block)
+
+    mobi_header = bytearray(mobi_len)
+    mobi_header[0:4] = b"MOBI"
+    struct.pack_into(">I", mobi_header, 4, mobi_len)
+    struct.pack_into(">I", mobi_header, 12, encoding)
+    struct.pack_into(">II", mobi_header, 68, name_offset, len(name))
+    struct.pack_into(">I", mobi_header, 112, 0x40 if exth_flag else 0)
+    record0 = bytes(16) + bytes(mobi_header) + exth_block + name
+
+    palm = bytearray(rec0_offset)
+    palm[0:len(db_name)] = db_name
+    palm[60:68] = db_type
+    struct.pack_into(">H", palm, 76, 1)
+    struct.pack_into(">I", palm, 78, rec0_offset)
+    data = bytes(palm) + record0
+    path.write_bytes(data[:truncate] if truncate else data)
+    return path
+
+
+class TestReadMobiMetadata:
+    """Test raw MOBI header and EXTH parsing"""
+
+    def test_exth_records(self, service, tmp_path):
+        path = _make_mobi(tmp_path / "book.mobi", exth=[
+            (100, "Ursula K. Le Guin"),
+            (101, "Ace Books"),
+            (105, "Fantasy"),
+            (105, "Classics"),
+            (503, "A Wizard of Earthsea"),
+        ])
+        metadata = service._read_mobi_metadata(str(path))
+
+        assert metadata.title == "A Wizard of Earthsea"  # EXTH 503 beats the full name
+        assert metadata.author == "Ursula K. Le Guin"
+        assert metadata.publisher == "Ace Books"
+        assert metadata.subjects == ["Fantasy", "Classics"]
+
+    def test_full_name_used_without_updated_title(self, service, tmp_path):
+        path = _make_mobi(tmp_path / "book.mobi", full_name="Full Name", exth=[(100, "Author")])
+        assert service._read_mobi_metadata(str(path)).title == "Full Name"
+
+    @pytest.mark.parametrize("encoding", [65001, 1252])
+    def test_text_encoding(self, service, tmp_path, encoding):
+        """Strings are decoded with the codec named in the MOBI header"""
+        path = _make_mobi(
+            tmp_path / "book.mobi",
+            full_name="Wuthering Heights – Brontë",
+            exth=[(100, "Emily Brontë")],
+            encoding=encoding,
+        )
+        metadata = service._read_mobi_metadata(str(path))
+
+        assert metadata.author == "Emily Brontë"
+        assert metadata.title == "Wuthering Heights – Brontë"
+
+    def test_missing_exth_flag_ignores_exth(self, service, tmp_path):
+        path = _make_mobi(tmp_path / "book.mobi", exth=[(100, "Author")], exth_flag=False)
+        metadata = service._read_mobi_metadata(str(path))
+
+        assert metadata.author is None
+        assert metadata.title == "Full Name"
+
+    @pytest.mark.parametrize("truncate", [100, 150, 88 + 16 + 232 + 6])
+    def test_truncated_file_falls_back_to_palm_name(self, service, tmp_path, truncate):
+        """A cut-off MOBI header or EXTH block does not raise"""
+        path = _make_mobi(tmp_path / "book.mobi", exth=[(100, "Author")], truncate=truncate)
+        metadata = service._read_mobi_metadata(str(path))
+
+        assert metadata.author is None
+        assert metadata.title == "Palm_Name"
+
+    def test_non_mobi_palm_file_uses_database_name(self, service, tmp_path):
+        path = _make_mobi(tmp_path / "book.mobi", db_type=b"TEXtREAd")
+        metadata = service._read_mobi_metadata(str(path))
+
+        assert metadata.title == "Palm_Name"
+        assert metadata.author is None
+
+
+class TestReadEpubMetadata:
+    """Test the OPF fast path against ebooklib"""
+
+    def test_fast_reader_matches_ebooklib(self, service, tmp_path):
+        path = str(_make_epub(tmp_path / "book.epub"))
+
+        fast = service._read_epub_metadata_fast(path)
+        assert fast is not None
+        assert fast.to_dict() == service._read_epub_metadata_ebooklib(path).to_dict()
+        assert fast.subjects == ["Science Fiction", "Classics"]
+        assert fast.publisher == "Ace Books"
+
+    @pytest.mark.parametrize("member, content", [
+        ("META-INF/container.xml", None),
+        ("META-INF/container.xml", b"this is not xml"),
+        ("META-INF/container.xml", b'<container xmlns="urn:oasis:names:tc:opendocument:xmlns:container"/>'),
+        ("META-INF/container.xml", (
+            b'<container xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+            b'<rootfile media-type="application/oebps-package+xml" full-path="missing.opf"/>'
+            b'</rootfiles></container>'
+        )),
+        ("EPUB/content.opf", b"<package>broken"),
+    ])
+    def test_fast_reader_gives_up_on_malformed_files(self, service, tmp_path, member, content):
+        path = _make_epub(tmp_path / "book.epub")
+        _replace_in_epub(path, member, content)
+
+        assert service._read_epub_metadata_fast(str(path)) is None
+
+    def test_falls_back_to_ebooklib(self, service, tmp_path, monkeypatch):
+        """When the fast path gives up the file is handed to ebooklib"""
+        path = _make_epub(tmp_path / "book.epub")
+        _replace_in_epub(path, "EPUB/content.opf", b"<package>broken")
+        handed_over = []
+
+        def ebooklib_reader(file_path):
+            handed_over.append(file_path)
+            return EbookMetadata(title="From ebooklib")
+
+        monkeypatch.setattr(service, "_read_epub_metadata_ebooklib", ebooklib_reader)
+
+        assert service._read_epub_metadata(str(path)).title == "From ebooklib"
+        assert handed_over == [str(path)]
+
+    def test_fast_path_skips_ebooklib(self, service, tmp_path, monkeypatch):
+        path = _make_epub(tmp_path / "book.epub")
+        monkeypatch.setattr(service, "_read_epub_metadata_ebooklib", pytest.fail)
+
+        assert service._read_epub_metadata(str(path)).title == "The Left Hand of Darkness"
+
+
+class TestMetadataCache:
+    """Test the (mtime, size) keyed cache in front of the parsers"""
+
+    @pytest.fixture
+    def parses(self, service, monkeypatch):
+        """Count EPUB parses while still reading the real file"""
+        calls = []
+        read_epub = service._read_epub_metadata
+
+        def counting(file_path):
+            calls.append(file_path)
+            return read_epub(file_path)
+
+        monkeypatch.setattr(service, "_read_epub_metadata", counting)
+        return calls
+
+    async def test_unchanged_file_is_parsed_once(self, service, tmp_path, parses):
+        path = str(_make_epub(tmp_path / "book.epub"))
+
+        first = await service.read_metadata(path)
+        second = await service.read_metadata(path)
+
+        assert first.to_dict() == second.to_dict()
+        assert len(parses) == 1
+
+    async def test_mtime_change_invalidates(self, service, tmp_path, parses):
+        """A touched file is re-parsed even though its size is unchanged"""
+        path = _make_epub(tmp_path / "book.epub")
+        await service.read_metadata(str(path))
+
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        await service.read_metadata(str(path))
+
+        assert len(parses) == 2
+
+    async def test_write_invalidates(self, service, tmp_path, parses):
+        """A real write changes the stored metadata"""
+        path = str(_make_epub(tmp_path / "book.epub"))
+        await service.read_metadata(path)
+
+        await service.write_metadata(path, EbookMetadata(title="The Dispossessed"))
+
+        assert (await service.read_metadata(path)).title == "The Dispossessed"
+        assert len(parses) == 2
+
+    async def test_write_invalidates_when_stat_is_unchanged(self, service, tmp_path, parses, monkeypatch):
+        """Writes drop the entry even when mtime granularity hides the rewrite"""
+        path = str(_make_epub(tmp_path / "book.epub"))
+        await service.read_metadata(path)
+        monkeypatch.setattr(service, "_write_epub_metadata", lambda file_path, metadata: True)
+
+        await service.write_metadata(path, EbookMetadata(title="Same Size"))
+        await service.read_metadata(path)
+
+        assert len(parses) == 2
+
+    async def test_callers_get_copies(self, service, tmp_path, parses):
+        """Mutating a returned result does not leak into the cache"""
+        path = str(_make_epub(tmp_path / "book.epub"))
+        first = await service.read_metadata(path)
+        first.title = "Changed"
+        first.subjects.append("Mutated")
+
+        second = await service.read_metadata(path)
+
+        assert second.title == "The Left Hand of Darkness"
+        assert second.subjects == ["Science Fiction", "Classics"]
+        assert second is not first
+        assert len(parses) == 1
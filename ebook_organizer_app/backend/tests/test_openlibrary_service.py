@@ -0,0 +1,119 @@
+"""
+Unit tests for the Open Library service caches
+"""
+
+import time
+
+import httpx
+import pytest
+
+from app.services import openlibrary_service
+from app.services.openlibrary_service import query_openlibrary, API_CACHE
+
+
+DOCS = {"docs": [{"title": "Dune", "author_name": ["Frank Herbert"], "subject": ["Science fiction"]}]}
+
+
+class StubClient:
+    """Stands in for the shared httpx client, replaying queued responses"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(dict(headers or {}))
+        status, body, etag = self.responses.pop(0)
+        return httpx.Response(
+            status,
+            json=body,
+            headers={"etag": etag} if etag else {},
+            request=httpx.Request("GET", url),
+        )
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    """Install a StubClient built from (status, body, etag) tuples"""
+    def install(*responses):
+        client = StubClient(*responses)
+        monkeypatch.setattr(openlibrary_service, "_get_client", lambda: client)
+        monkeypatch.setattr(openlibrary_service, "API_RATE_LIMIT_DELAY", 0)
+        return client
+    return install
+
+
+def _age_disk_entries(seconds):
+    """Move every disk cache timestamp back by seconds"""
+    conn = openlibrary_service._get_disk_cache()
+    conn.execute("UPDATE openlibrary_cache SET ts = ts - ?", (seconds,))
+    conn.commit()
+
+
+class TestQueryOpenLibraryCache:
+    """Test the memory and disk caches in front of the API"""
+
+    def test_disk_hit_after_memory_cleared(self, stub_client):
+        """A fresh disk entry answers without a request once memory is cleared"""
+        client = stub_client((200, DOCS, "v1"))
+        first = query_openlibrary("Dune", "Frank Herbert")
+        assert first["author"] == "Frank Herbert"
+
+        API_CACHE.clear()
+        assert query_openlibrary("Dune", "Frank Herbert") == first
+        assert len(client.requests) == 1
+        # ...and the disk hit is promoted back into memory
+        assert "Dune|Frank Herbert" in API_CACHE
+
+    def test_expired_entry_is_refetched(self, stub_client):
+        """Entries past their TTL go back to the API"""
+        updated = {"docs": [{"title": "Dune", "author_name": ["F. Herbert"], "subject": []}]}
+        client = stub_client((200, DOCS, None), (200, updated, None))
+        query_openlibrary("Dune")
+
+        API_CACHE.clear()
+        _age_disk_entries(openlibrary_service.API_CACHE_TTL + 1)
+        assert query_openlibrary("Dune")["author"] == "F. Herbert"
+        assert len(client.requests) == 2
+
+    def test_negative_entries_use_shorter_ttl(self, stub_client):
+        """'Not found' answers expire after API_NEGATIVE_CACHE_TTL"""
+        client = stub_client((200, {"docs": []}, None), (200, DOCS, None))
+        assert query_openlibrary("Dune") is None
+
+        API_CACHE.clear()
+        _age_disk_entries(openlibrary_service.API_NEGATIVE_CACHE_TTL + 1)
+        assert query_openlibrary("Dune")["title"] == "Dune"
+        assert len(client.requests) == 2
+
+    def test_stale_entry_revalidated_with_etag(self, stub_client):
+        """A 304 keeps the stored answer and refreshes its timestamp"""
+        client = stub_client((200, DOCS, "v1"), (304, None, None))
+        first = query_openlibrary("Dune")
+
+        API_CACHE.clear()
+        _age_disk_entries(openlibrary_service.API_CACHE_TTL + 1)
+        assert query_openlibrary("Dune") == first
+        assert client.requests[1]["If-None-Match"] == "v1"
+
+        etag, ts, _ = openlibrary_service._disk_get("Dune|")
+        assert etag == "v1"
+        assert time.time() - ts < 60
+
+    def test_offline_miss_returns_none_uncached(self, stub_client):
+        """network=False never calls the API and does not cache the miss"""
+        client = stub_client()
+        assert query_openlibrary("Dune", network=False) is None
+        assert client.requests == []
+        assert "Dune|" not in API_CACHE
+        assert openlibrary_service._disk_get("Dune|") is None
+
+    def test_offline_uses_stale_disk_entry(self, stub_client):
+        """network=False still answers from an expired disk entry"""
+        client = stub_client((200, DOCS, None))
+        first = query_openlibrary("Dune")
+
+        API_CACHE.clear()
+        _age_disk_entries(openlibrary_service.API_CACHE_TTL + 1)
+        assert query_openlibrary("Dune", network=False) == first
+        assert len(client.requests) == 1
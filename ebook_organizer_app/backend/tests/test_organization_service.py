@@ -0,0 +1,91 @@
+"""
+Unit tests for organization service batch classification
+"""
+
+import pytest
+
+from app.models.database import Ebook
+from app.services import metadata_classifier
+from app.services.organization_service import batch_classify_ebooks
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Stub Open Library lookups; titles containing "Broken" raise"""
+    calls = []
+
+    def lookup(filepath, author, network):
+        calls.append(filepath)
+        if "Broken" in filepath:
+            raise RuntimeError("lookup exploded")
+        return "Api Author", "Fiction", "Mystery"
+
+    monkeypatch.setattr(metadata_classifier, "lookup_book_metadata", lookup)
+    return calls
+
+
+@pytest.fixture
+def books(db_session):
+    """One book to override and two to classify, one of which fails"""
+    ebooks = {
+        name: Ebook(
+            title=name, cloud_provider="local", cloud_file_id=name,
+            cloud_file_path=f"/library/misc/{name}.epub",
+        )
+        for name in ("Manual Pick", "Quiet Harbor", "Broken Record")
+    }
+    db_session.add_all(ebooks.values())
+    db_session.commit()
+    return {name: ebook.id for name, ebook in ebooks.items()}
+
+
+class TestBatchClassifyEbooks:
+    """Test overrides and classification applied in one batch"""
+
+    def test_overrides_with_classification_and_a_failure(self, db_session, books, lookups):
+        override_id = books["Manual Pick"]
+        result = batch_classify_ebooks(
+            db_session,
+            ebook_ids=list(books.values()),
+            overrides={str(override_id): {"category": "Non-Fiction", "sub_genre": "History"}},
+        )
+
+        assert result.total_processed == 2
+        assert result.newly_classified == 2
+        assert result.failed == 1
+
+        assert result.results[override_id].metadata_source == "manual_override"
+        assert result.results[books["Quiet Harbor"]].metadata_source == "api"
+        assert result.results[books["Broken Record"]].metadata_source == "error: lookup exploded"
+
+        # The overridden book is not sent through classification
+        assert "/library/misc/Manual Pick.epub" not in lookups
+        # ...and the failure only cost the broken book its lookup, not a re-run
+        assert sorted(lookups) == ["/library/misc/Broken Record.epub", "/library/misc/Quiet Harbor.epub"]
+
+        stored = {ebook.title: (ebook.category, ebook.sub_genre) for ebook in db_session.query(Ebook)}
+        assert stored == {
+            "Manual Pick": ("Non-Fiction", "History"),
+            "Quiet Harbor": ("Fiction", "Mystery"),
+            "Broken Record": (None, None),
+        }
+        assert result.file_classifications == {
+            "/library/misc/Manual Pick.epub": {"category": "Non-Fiction", "sub_genre": "History"},
+            "/library/misc/Quiet Harbor.epub": {"category": "Fiction", "sub_genre": "Mystery"},
+        }
+
+    def test_unchanged_override_counts_as_already_classified(self, db_session, books, lookups):
+        override_id = books["Quiet Harbor"]
+        ebook = db_session.get(Ebook, override_id)
+        ebook.category, ebook.sub_genre = "Fiction", "Mystery"
+        db_session.commit()
+
+        result = batch_classify_ebooks(
+            db_session,
+            ebook_ids=[override_id],
+            overrides={str(override_id): {"category": "Fiction", "sub_genre": "Mystery"}},
+        )
+
+        assert result.already_classified == 1
+        assert result.newly_classified == 0
+        assert lookups == []
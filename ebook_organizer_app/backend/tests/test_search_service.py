@@ -0,0 +1,104 @@
+"""
+Unit tests for the search service result cache
+"""
+
+import pytest
+from sqlalchemy import delete, insert, update
+
+from app.models.database import Ebook
+from app.services import search_service
+from app.services.search_service import init_fts, invalidate_search_cache, search_ebooks
+
+
+@pytest.fixture
+def fts_db(db_session):
+    """Test session with FTS set up, two books and an empty search cache"""
+    init_fts(db_session)
+    db_session.add_all([
+        Ebook(title="Dragon Rider", cloud_provider="local", cloud_file_id="1"),
+        Ebook(title="Dragon Keeper", cloud_provider="local", cloud_file_id="2"),
+    ])
+    db_session.commit()
+    invalidate_search_cache()
+    yield db_session
+    invalidate_search_cache()
+
+
+def _cached_search(db):
+    """Search for 'dragon' and check the result was cached"""
+    results, total = search_ebooks(db, "dragon")
+    assert search_service._search_cache
+    return results, total
+
+
+class TestSearchCache:
+    """Test that Ebook writes invalidate cached search results"""
+
+    def test_repeat_search_is_cached(self, fts_db):
+        _, total = _cached_search(fts_db)
+        assert total == 2
+        assert search_ebooks(fts_db, "dragon")[1] == 2
+
+    def test_orm_update_invalidates(self, fts_db):
+        _cached_search(fts_db)
+        ebook = fts_db.query(Ebook).filter_by(cloud_file_id="1").one()
+        ebook.title = "Griffin Rider"
+        fts_db.commit()
+
+        assert not search_service._search_cache
+        assert search_ebooks(fts_db, "dragon")[1] == 1
+
+    def test_bulk_insert_invalidates(self, fts_db):
+        _cached_search(fts_db)
+        fts_db.execute(insert(Ebook), [
+            {"title": "Dragon Hoard", "cloud_provider": "local", "cloud_file_id": "3"},
+        ])
+        assert not search_service._search_cache
+        fts_db.commit()
+
+        assert search_ebooks(fts_db, "dragon")[1] == 3
+
+    def test_bulk_update_invalidates(self, fts_db):
+        _cached_search(fts_db)
+        fts_db.execute(update(Ebook).where(Ebook.cloud_file_id == "2").values(title="Wyvern Keeper"))
+        assert not search_service._search_cache
+        fts_db.commit()
+
+        assert search_ebooks(fts_db, "dragon")[1] == 1
+
+    def test_delete_invalidates(self, fts_db):
+        _cached_search(fts_db)
+        fts_db.delete(fts_db.query(Ebook).filter_by(cloud_file_id="1").one())
+        fts_db.commit()
+
+        assert not search_service._search_cache
+        assert search_ebooks(fts_db, "dragon")[1] == 1
+
+    def test_bulk_delete_invalidates(self, fts_db):
+        _cached_search(fts_db)
+        fts_db.execute(delete(Ebook).where(Ebook.cloud_file_id == "1"))
+        assert not search_service._search_cache
+
+    def test_rollback_invalidates(self, fts_db):
+        """Results computed from rolled-back rows are dropped"""
+        fts_db.execute(insert(Ebook), [
+            {"title": "Dragon Egg", "cloud_provider": "local", "cloud_file_id": "3"},
+        ])
+        version = search_service._search_cache_version
+        fts_db.rollback()
+
+        assert search_service._search_cache_version > version
+        assert search_ebooks(fts_db, "dragon")[1] == 2
+
+    def test_pending_changes_are_not_cached(self, fts_db):
+        """A session with unflushed or uncommitted Ebook changes does not fill the cache"""
+        fts_db.add(Ebook(title="Dragon Egg", cloud_provider="local", cloud_file_id="3"))
+        search_ebooks(fts_db, "dragon")
+        assert not search_service._search_cache
+
+        fts_db.flush()
+        assert search_ebooks(fts_db, "dragon")[1] == 3
+        assert not search_service._search_cache
+
+        fts_db.commit()
+        _cached_search(fts_db)
@@ -0,0 +1,167 @@
+"""
+Unit tests for local folder sync
+"""
+
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app.models.database import Ebook
+from app.services.metadata_service import EbookMetadata, metadata_service
+from app.services.search_service import disable_fts_triggers, init_fts
+from app.services.sync_service import SyncService
+
+
+@pytest.fixture
+def fts_db(db_session):
+    """Test session with the FTS table and triggers in place"""
+    init_fts(db_session)
+    return db_session
+
+
+def _fts_ids(db, term):
+    """Ebook ids the FTS index matches for term"""
+    return sorted(db.execute(
+        text("SELECT rowid FROM ebooks_fts WHERE ebooks_fts MATCH :term"), {"term": term}
+    ).scalars())
+
+
+def _make_books(folder, count, stem="book"):
+    """Create count empty .epub files and return their paths"""
+    folder.mkdir(exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = folder / f"{stem}_{i}.epub"
+        path.write_bytes(b"")
+        paths.append(path)
+    return paths
+
+
+class TestFtsDeferral:
+    """Test that rows written while FTS triggers are off end up searchable"""
+
+    async def test_deferred_sync_rows_are_searchable(self, fts_db, tmp_path):
+        """A sync past FTS_DEFER_MIN_ROWS rebuilds the index at the end"""
+        service = SyncService()
+        service.COMMIT_BATCH_SIZE = 4
+        service.FTS_DEFER_MIN_ROWS = 4
+        _make_books(tmp_path / "library", 13, stem="deferred")
+
+        response = await service.sync_local_folder(str(tmp_path / "library"), False, fts_db)
+
+        assert response.status == "completed"
+        assert response.books_added == 13
+        ids = [ebook.id for ebook in fts_db.query(Ebook).all()]
+        assert _fts_ids(fts_db, "deferred") == sorted(ids)
+        # Triggers are back, so later inserts are indexed directly
+        fts_db.add(Ebook(title="Later addition", cloud_provider="local", cloud_file_id="later"))
+        fts_db.commit()
+        assert len(_fts_ids(fts_db, "later")) == 1
+
+    def test_startup_rebuilds_after_interrupted_bulk_load(self, fts_db):
+        """init_fts restores dropped triggers and indexes rows written meanwhile"""
+        assert disable_fts_triggers(fts_db) is True
+        fts_db.add(Ebook(title="Orphaned volume", cloud_provider="local", cloud_file_id="orphan"))
+        fts_db.commit()
+        assert _fts_ids(fts_db, "orphaned") == []
+
+        # What init_db() runs on the next start
+        init_fts(fts_db)
+
+        assert len(_fts_ids(fts_db, "orphaned")) == 1
+        triggers = set(fts_db.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        ).scalars())
+        assert {"ebooks_ai", "ebooks_au", "ebooks_ad"} <= triggers
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Stub metadata reads: returns the list of paths each read_many call parsed.
+    
+    Titles come from the file's contents, so rewriting a file changes its title.
+    """
+    calls = []
+
+    async def read_many(paths):
+        calls.append(sorted(paths))
+        return {
+            path: EbookMetadata(title=open(path).read() or None, author="Some Author")
+            for path in paths
+        }
+
+    monkeypatch.setattr(metadata_service, "read_many", read_many)
+    return calls
+
+
+def _write(path, content, mtime):
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+
+
+class TestLocalSyncFingerprint:
+    """Test size/mtime change detection for files already in the library"""
+
+    @pytest.fixture
+    def book(self, tmp_path):
+        path = tmp_path / "library" / "novel.epub"
+        path.parent.mkdir()
+        _write(path, "First Title", 1_700_000_000)
+        return path
+
+    async def _sync(self, db, book, full_sync=False):
+        return await SyncService().sync_local_folder(str(book.parent), full_sync, db)
+
+    async def test_unchanged_file_is_skipped(self, db_session, book, parsed):
+        await self._sync(db_session, book)
+        response = await self._sync(db_session, book)
+
+        assert response.books_added == 0
+        assert response.books_updated == 0
+        assert len(parsed) == 1  # only the first sync read the file
+
+    async def test_changed_file_is_refreshed(self, db_session, book, parsed):
+        await self._sync(db_session, book)
+        _write(book, "Second Edition Title", 1_700_000_100)
+
+        response = await self._sync(db_session, book)
+
+        assert response.books_updated == 1
+        ebook = db_session.query(Ebook).one()
+        assert ebook.title == "Second Edition Title"
+        assert ebook.file_size == len("Second Edition Title")
+        assert ebook.cloud_modified_time.timestamp() == 1_700_000_100
+
+    async def test_full_sync_reparses_unchanged_file(self, db_session, book, parsed):
+        await self._sync(db_session, book)
+        ebook = db_session.query(Ebook).one()
+        ebook.title = "Edited By Hand"
+        db_session.commit()
+
+        response = await self._sync(db_session, book, full_sync=True)
+
+        assert response.books_updated == 1
+        assert len(parsed) == 2
+        assert db_session.query(Ebook).one().title == "First Title"
+
+    async def test_legacy_record_is_backfilled_not_reparsed(self, db_session, book, parsed):
+        """Rows synced before mtimes were stored take the current stat as baseline"""
+        db_session.add(Ebook(
+            title="Legacy Title", cloud_provider="local", file_size=1,
+            cloud_file_id=str(book), cloud_file_path=str(book), cloud_modified_time=None,
+        ))
+        db_session.commit()
+
+        response = await self._sync(db_session, book)
+
+        assert response.books_updated == 0
+        assert parsed == []
+        ebook = db_session.query(Ebook).one()
+        assert ebook.title == "Legacy Title"
+        assert ebook.file_size == len("First Title")
+        assert ebook.cloud_modified_time.timestamp() == 1_700_000_000
+
+        # The backfilled fingerprint is used from then on
+        await self._sync(db_session, book)
+        assert parsed == []
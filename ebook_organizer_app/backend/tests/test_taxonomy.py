@@ -8,6 +8,7 @@ from app.services.taxonomy import (
     classify_genre,
     classify_from_folder,
     classify_from_title,
+    classify_from_known_work,
     TAXONOMY
 )
 
@@ -135,6 +136,35 @@ class TestClassifyFromTitle:
         assert classify_from_title(None) == (None, None)
 
 
+class TestClassifyFromKnownWork:
+    """Test known author/series classification"""
+    
+    def test_known_author(self):
+        """Test author lookup ignores case, spacing and punctuation"""
+        assert classify_from_known_work("The Hobbit", "J.R.R. Tolkien") == ("Fiction", "Fantasy")
+        assert classify_from_known_work("The Hobbit", "J. R. R. TOLKIEN") == ("Fiction", "Fantasy")
+        assert classify_from_known_work("Murder on the Orient Express", "Agatha Christie") == ("Fiction", "Mystery & Thriller")
+    
+    def test_known_series(self):
+        """Test series names in titles"""
+        assert classify_from_known_work("Harry Potter and the Goblet of Fire", None) == ("Fiction", "Fantasy")
+        assert classify_from_known_work("Star Wars - Heir to the Empire", "Unknown") == ("Fiction", "Science Fiction")
+        assert classify_from_known_work("The_Wheel_of_Time_01", None) == ("Fiction", "Fantasy")
+        assert classify_from_known_work("A Song of Ice and Fire: A Game of Thrones", None) == ("Fiction", "Fantasy")
+    
+    def test_series_must_lead_the_title(self):
+        """Books about a series, or merely mentioning one, are not classified by it"""
+        assert classify_from_known_work("The Science of Star Wars", None) == (None, None)
+        assert classify_from_known_work("Sherlock Holmes: a critical study", None) == (None, None)
+        assert classify_from_known_work("The Star Wars Companion", None) == (None, None)
+        assert classify_from_known_work("Mistborne Chronicles", None) == (None, None)
+    
+    def test_no_match(self):
+        """Test unknown authors and titles"""
+        assert classify_from_known_work("Random Book Title", "Jane Doe") == (None, None)
+        assert classify_from_known_work(None, None) == (None, None)
+
+
 class TestTaxonomyStructure:
     """Test the taxonomy structure itself"""
     
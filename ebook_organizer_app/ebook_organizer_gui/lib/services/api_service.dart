@@ -540,13 +540,17 @@ class ApiService {
   }
 
   /// Get classification preview (dry run)
+  ///
+  /// Uses cached Open Library lookups only unless [network] is true.
   Future<Map<String, dynamic>> getClassificationPreview({
     String? sourcePath,
     int limit = 100,
+    bool network = false,
   }) async {
     final queryParams = {
       'limit': limit.toString(),
       if (sourcePath != null) 'source_path': sourcePath,
+      if (network) 'network': 'true',
     };
 
     final uri = Uri.parse('$baseUrl/api/organization/preview')